@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.core.signals import request_started
+
+        from api_yamdb import checks  # noqa: F401
+        from api_yamdb.db import check_connections
+        from . import signals  # noqa: F401
+
+        request_started.connect(check_connections)
@@ -0,0 +1,90 @@
+"""Асинхронные варианты представлений для запуска под ASGI.
+
+ORM в Django 3.2 синхронный, а ASGIHandler выполняет синхронные
+представления по одному в общем потоке. Здесь горячие представления
+чтения оборачиваются в корутины, которые выполняют тот же код DRF в
+отдельном ограниченном пуле потоков: процесс обслуживает столько запросов
+к базе одновременно, сколько потоков в пуле, а ожидание медленных клиентов
+потоков не занимает. Ответы совпадают с синхронными, потому что код
+представлений тот же.
+"""
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import close_old_connections
+from django.urls import URLPattern, URLResolver
+
+from api_yamdb.db import check_connections
+
+# Имена маршрутов DefaultRouter, которые под ASGI выполняются в пуле.
+ASYNC_ROUTES = ('titles-list', 'titles-detail', 'reviews-list',
+                'comments-list')
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.ASYNC_VIEW_THREADS,
+            thread_name_prefix='api-view'
+        )
+    return _executor
+
+
+def run_in_pool(view):
+    """Оборачивает синхронное представление в корутину."""
+    def call(request, *args, **kwargs):
+        # У каждого потока пула свои соединения с базой: их жизненный цикл
+        # повторяет то, что обработчик делает в начале и конце запроса.
+        close_old_connections()
+        check_connections()
+        try:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+            return response
+        finally:
+            close_old_connections()
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            get_executor(),
+            functools.partial(context.run, call, request, *args, **kwargs)
+        )
+    return async_view
+
+
+def asynchronous(patterns):
+    """Копия маршрутов, где представления из ASYNC_ROUTES асинхронные."""
+    result = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            pattern = URLResolver(
+                pattern.pattern, asynchronous(pattern.url_patterns),
+                pattern.default_kwargs, pattern.app_name, pattern.namespace
+            )
+        elif pattern.name in ASYNC_ROUTES:
+            pattern = URLPattern(
+                pattern.pattern, run_in_pool(pattern.callback),
+                pattern.default_args, pattern.name
+            )
+        result.append(pattern)
+    return result
+
+
+class AsyncViewsHandler(ASGIHandler):
+    """ASGI-обработчик, разрешающий адреса по ASGI_URLCONF."""
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        if request is not None:
+            request.urlconf = settings.ASGI_URLCONF
+        return request, error_response
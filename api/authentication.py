@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+from api_yamdb.routers import is_pinned, replica_reads, use_primary
+from custom_user.models import User
+
+# Порядок полей должен совпадать с порядком в модели: так их ждёт from_db.
+USER_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in ('id', 'username', 'role', 'is_staff',
+                         'is_superuser', 'is_active')
+)
+
+
+class UserCache:
+    """LRU-кэш полей пользователя с ограниченным временем жизни.
+
+    Хранится в памяти процесса; если задан CACHE_ALIAS, вторым уровнем
+    служит кэш Django, общий для воркеров. Записи сбрасываются сигналами
+    при сохранении и удалении пользователя, а в других процессах
+    устаревают не позже чем через TTL секунд.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    @property
+    def config(self):
+        return settings.AUTH_USER_CACHE
+
+    def shared_cache(self):
+        alias = self.config['CACHE_ALIAS']
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def key(user_id):
+        return f'auth-user:{user_id}'
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(user_id)
+                return entry[1]
+        shared = self.shared_cache()
+        values = shared.get(self.key(user_id)) if shared else None
+        if values is None:
+            values = User.objects.filter(pk=user_id).values_list(
+                *USER_FIELDS
+            ).first()
+            if values is None:
+                return None
+            if shared:
+                shared.set(self.key(user_id), values, self.config['TTL'])
+        with self.lock:
+            self.entries[user_id] = (now + self.config['TTL'], values)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.config['MAX_SIZE']:
+                self.entries.popitem(last=False)
+        return values
+
+    def delete(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+        shared = self.shared_cache()
+        if shared:
+            shared.delete(self.key(user_id))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса пользователя к базе на каждый запрос.
+
+    Возвращает экземпляр User, в котором загружены только поля
+    USER_FIELDS, нужные для проверки прав; остальные поля отложены и
+    подгружаются при обращении.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        if is_pinned(user_id):
+            use_primary()
+        values = user_cache.get(user_id)
+        if values is None and replica_reads.get():
+            # Реплика могла ещё не получить только что созданного
+            # пользователя.
+            use_primary()
+            values = user_cache.get(user_id)
+        if values is None:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+        user = User.from_db(router.db_for_read(User), USER_FIELDS, values)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return user
@@ -0,0 +1,32 @@
+import statistics
+
+
+def percentile(samples, percent):
+    """Перцентиль по отсортированной выборке (метод ближайшего ранга)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1,
+                      round(percent / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies, elapsed):
+    """Сводка по длительностям запросов в секундах, значения — в мс."""
+    return {
+        'requests': len(latencies),
+        'throughput': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3)
+        if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def format_summary(summary):
+    return (
+        f'{summary["requests"]} запросов, {summary["throughput"]} в сек, '
+        f'среднее {summary["mean_ms"]} мс, p50 {summary["p50_ms"]} мс, '
+        f'p95 {summary["p95_ms"]} мс, p99 {summary["p99_ms"]} мс'
+    )
@@ -0,0 +1,313 @@
+from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import DatabaseError, connections, transaction
+from rest_framework import serializers
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import rebuild_ratings
+from reviews.validators import validate_year
+from .cache import CATEGORIES, GENRES, TITLES, bump_generation
+from .serializers import DUPLICATE_REVIEW
+
+
+class SlugItemSerializer(serializers.Serializer):
+    """Элемент пакетной загрузки жанров и категорий"""
+    name = serializers.CharField(max_length=256)
+    slug = serializers.SlugField(max_length=50)
+
+
+class TitleItemSerializer(serializers.Serializer):
+    """Элемент пакетной загрузки произведений.
+
+    Жанры и категория передаются слагами и проверяются по словарям,
+    собранным одним запросом на всю пачку.
+    """
+    id = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=256)
+    year = serializers.IntegerField(min_value=0, validators=[validate_year])
+    description = serializers.CharField(allow_blank=True)
+    genre = serializers.ListField(
+        child=serializers.SlugField(), required=False
+    )
+    category = serializers.SlugField(required=False, allow_null=True)
+
+    def validate_genre(self, value):
+        missing = set(value) - self.context['genres'].keys()
+        if missing:
+            raise serializers.ValidationError(
+                f'Жанры не найдены: {", ".join(sorted(missing))}'
+            )
+        return value
+
+    def validate_category(self, value):
+        if value is not None and value not in self.context['categories']:
+            raise serializers.ValidationError(
+                f'Категория не найдена: {value}'
+            )
+        return value
+
+
+class ReviewItemSerializer(serializers.Serializer):
+    """Элемент пакетного создания отзывов"""
+    title = serializers.IntegerField()
+    text = serializers.CharField()
+    score = serializers.IntegerField(validators=[
+        MinValueValidator(1, 'Допустимы значения от 1 до 10'),
+        MaxValueValidator(10, 'Допустимы значения от 1 до 10')
+    ])
+
+
+class CommentItemSerializer(serializers.Serializer):
+    """Элемент пакетного создания комментариев"""
+    review = serializers.IntegerField()
+    text = serializers.CharField()
+
+
+class BulkResult:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+
+    def error(self, index, errors):
+        self.errors.append({'index': index, 'errors': errors})
+
+    @property
+    def data(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'errors': sorted(self.errors, key=lambda error: error['index']),
+        }
+
+
+def get_batch_size(request):
+    try:
+        size = int(request.query_params.get('batch_size', 0))
+    except ValueError:
+        size = 0
+    if size <= 0:
+        return settings.BULK_BATCH_SIZE
+    return min(size, settings.BULK_MAX_BATCH_SIZE)
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def validate_items(items, serializer_class, result, context=None):
+    """Проверяет элементы и возвращает пары (индекс, данные) без ошибок."""
+    valid = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            result.error(index, {'non_field_errors': ['Ожидался объект.']})
+            continue
+        serializer = serializer_class(data=item, context=context or {})
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            result.error(index, serializer.errors)
+    return valid
+
+
+def chunk_failed(indexes, result):
+    """Отмечает элементы пачки, откатанной из-за ошибки базы данных.
+
+    Транзакция у каждой пачки своя, поэтому ранее сохранённые пачки
+    остаются, а остальные продолжают загружаться.
+    """
+    for index in indexes:
+        result.error(index, {'non_field_errors': [
+            'Пачка не сохранена из-за ошибки базы данных, повторите.'
+        ]})
+
+
+def drop_duplicates(valid, key, result):
+    """Оставляет первое вхождение каждого ключа, остальные — в ошибки."""
+    seen = set()
+    unique = []
+    for index, data in valid:
+        value = data.get(key)
+        if value is not None and value in seen:
+            result.error(index, {key: [f'Повтор значения {value} в пачке.']})
+            continue
+        seen.add(value)
+        unique.append((index, data))
+    return unique
+
+
+def upsert_by_slug(model, items, batch_size):
+    """Создаёт или обновляет жанры и категории по slug."""
+    result = BulkResult()
+    valid = drop_duplicates(
+        validate_items(items, SlugItemSerializer, result), 'slug', result
+    )
+    for chunk in chunks(valid, batch_size):
+        existing = model.objects.in_bulk(
+            [data['slug'] for _, data in chunk], field_name='slug'
+        )
+        new, changed = [], []
+        for _, data in chunk:
+            obj = existing.get(data['slug'])
+            if obj is None:
+                new.append(model(**data))
+            elif obj.name != data['name']:
+                obj.name = data['name']
+                changed.append(obj)
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(new)
+                model.objects.bulk_update(changed, ('name',))
+        except DatabaseError:
+            chunk_failed([index for index, _ in chunk], result)
+            continue
+        result.created += len(new)
+        result.updated += len(changed)
+    namespace = GENRES if model is Genre else CATEGORIES
+    bump_generation(namespace, TITLES)
+    return result
+
+
+def save_titles(new, changed, genres, context, can_return_ids):
+    through = Title.genre.through
+    if can_return_ids:
+        Title.objects.bulk_create(new)
+    else:
+        for title in new:
+            title.save()
+    Title.objects.bulk_update(
+        changed, ('name', 'year', 'description', 'category')
+    )
+    through.objects.filter(
+        title_id__in=[title.pk for title, _ in genres.values()]
+    ).delete()
+    through.objects.bulk_create(
+        through(title_id=title.pk, genre_id=context['genres'][slug])
+        for title, slugs in genres.values()
+        for slug in dict.fromkeys(slugs)
+    )
+
+
+def upsert_titles(items, batch_size):
+    """Создаёт произведения и обновляет переданные по id.
+
+    Слаги жанров и категорий всей пачки разрешаются двумя запросами,
+    связи с жанрами вставляются через bulk_create промежуточной модели.
+    """
+    result = BulkResult()
+    genre_slugs, category_slugs = set(), set()
+    for item in items:
+        if isinstance(item, dict):
+            genre = item.get('genre')
+            if isinstance(genre, list):
+                genre_slugs.update(map(str, genre))
+            category_slugs.add(str(item.get('category')))
+    context = {
+        'genres': dict(Genre.objects.filter(
+            slug__in=genre_slugs).values_list('slug', 'id')),
+        'categories': dict(Category.objects.filter(
+            slug__in=category_slugs).values_list('slug', 'id')),
+    }
+    valid = drop_duplicates(
+        validate_items(items, TitleItemSerializer, result, context),
+        'id', result
+    )
+    can_return_ids = connections[
+        Title.objects.db].features.can_return_rows_from_bulk_insert
+    for chunk in chunks(valid, batch_size):
+        existing = Title.objects.in_bulk(
+            [data['id'] for _, data in chunk if 'id' in data]
+        )
+        new, changed, genres, written = [], [], {}, []
+        for index, data in chunk:
+            if 'id' in data and data['id'] not in existing:
+                result.error(index, {'id': ['Произведение не найдено.']})
+                continue
+            title = existing.get(data.get('id')) or Title()
+            title.name = data['name']
+            title.year = data['year']
+            title.description = data['description']
+            if 'category' in data or title.pk is None:
+                title.category_id = context['categories'].get(
+                    data.get('category')
+                )
+            (changed if title.pk else new).append(title)
+            written.append(index)
+            if 'genre' in data:
+                genres[id(title)] = (title, data['genre'])
+        try:
+            with transaction.atomic():
+                save_titles(new, changed, genres, context, can_return_ids)
+        except DatabaseError:
+            chunk_failed(written, result)
+            continue
+        result.created += len(new)
+        result.updated += len(changed)
+    bump_generation(TITLES)
+    return result
+
+
+def create_reviews(author, items):
+    """Создаёт отзывы автора на разные произведения одной транзакцией.
+
+    Несуществующие произведения и повторные отзывы (в пачке или уже
+    сохранённые) возвращаются ошибками; проверки делаются двумя
+    запросами на всю пачку.
+    """
+    result = BulkResult()
+    valid = validate_items(items, ReviewItemSerializer, result)
+    title_ids = {data['title'] for _, data in valid}
+    existing_titles = set(Title.objects.filter(
+        id__in=title_ids).values_list('id', flat=True))
+    reviewed = set(Review.objects.filter(
+        author=author, title_id__in=title_ids
+    ).values_list('title_id', flat=True))
+    reviews = []
+    for index, data in valid:
+        if data['title'] not in existing_titles:
+            result.error(index, {'title': ['Произведение не найдено.']})
+        elif data['title'] in reviewed:
+            result.error(index, {'title': [DUPLICATE_REVIEW]})
+        else:
+            reviewed.add(data['title'])
+            reviews.append(Review(
+                author=author, title_id=data['title'], text=data['text'],
+                score=data['score']
+            ))
+    with transaction.atomic():
+        Review.objects.bulk_create(reviews)
+        touched = {review.title_id for review in reviews}
+        rebuild_ratings(Title.objects.filter(id__in=touched))
+    result.created = len(reviews)
+    bump_generation(TITLES)
+    return result
+
+
+def create_comments(author, items):
+    """Создаёт комментарии автора к отзывам одной транзакцией.
+
+    Одинаковые комментарии к одному отзыву внутри пачки отбрасываются.
+    """
+    result = BulkResult()
+    valid = validate_items(items, CommentItemSerializer, result)
+    existing_reviews = set(Review.objects.filter(
+        id__in={data['review'] for _, data in valid}
+    ).values_list('id', flat=True))
+    seen = set()
+    comments = []
+    for index, data in valid:
+        key = (data['review'], data['text'])
+        if data['review'] not in existing_reviews:
+            result.error(index, {'review': ['Отзыв не найден.']})
+        elif key in seen:
+            result.error(index, {'text': ['Повтор комментария в пачке.']})
+        else:
+            seen.add(key)
+            comments.append(Comment(
+                author=author, review_id=data['review'], text=data['text']
+            ))
+    with transaction.atomic():
+        Comment.objects.bulk_create(comments)
+    result.created = len(comments)
+    return result
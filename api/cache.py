@@ -0,0 +1,91 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.utils.encoders import JSONEncoder
+
+from .metrics import registry
+
+CATEGORIES = 'categories'
+GENRES = 'genres'
+TITLES = 'titles'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def generation_key(namespace):
+    return f'generation:{namespace}'
+
+
+def get_generation(namespace):
+    """Текущее поколение данных пространства имён.
+
+    Начальное значение берётся из времени, чтобы после вытеснения
+    счётчика из кэша не выдать заново старые записи.
+    """
+    return get_cache().get_or_set(
+        generation_key(namespace), time.time_ns(), timeout=None
+    )
+
+
+def bump_generation(*namespaces):
+    """Делает недействительными все закэшированные ответы пространств имён.
+
+    Поколения сдвигаются после коммита транзакции, иначе параллельный
+    запрос мог бы закэшировать ещё не изменённые данные под новым
+    поколением. Новое поколение — время сдвига в наносекундах: по нему
+    видно, насколько оно свежее (см. is_fresh).
+    """
+    def bump():
+        cache = get_cache()
+        for namespace in namespaces:
+            cache.set(generation_key(namespace), time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def is_fresh(generation):
+    """Сдвинуто ли поколение недавно, в пределах задержки реплик.
+
+    Реплика может ещё не получить запись, сдвинувшую такое поколение,
+    поэтому данные для кэша под ним читаются из основной базы.
+    """
+    return time.time_ns() - generation < settings.REPLICA_PIN_SECONDS * 10**9
+
+
+def normalized_query(request):
+    return sorted(
+        (name, sorted(values))
+        for name, values in request.query_params.lists()
+    )
+
+
+def response_cache_key(namespace, generation, request):
+    digest = hashlib.md5(
+        json.dumps([request.path, normalized_query(request)]).encode()
+    ).hexdigest()
+    return f'response:{namespace}:{generation}:{digest}'
+
+
+def make_etag(data):
+    return hashlib.md5(
+        json.dumps(data, cls=JSONEncoder).encode()
+    ).hexdigest()
+
+
+def count_hit(hit):
+    """Учитывает обращение к кэшу в счётчиках процесса.
+
+    Счётчики живут в памяти, а не в самом кэше: иначе каждое чтение
+    превращалось бы в запись, для файлового бэкенда — в запись файла.
+    """
+    registry.count_cache_lookup(hit)
+
+
+def cache_stats():
+    return registry.cache_stats()
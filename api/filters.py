@@ -1,14 +1,58 @@
 import django_filters as filters
+from django.db import connections
+from django.db.models import Q
+from django.db.models.functions import Greatest
+from rest_framework.filters import SearchFilter
 
 from reviews.models import Title
 
 
+def search_queryset(queryset, fields, terms):
+    """Ищет без учёта регистра и на PostgreSQL ранжирует по похожести.
+
+    Каждое слово должно встретиться хотя бы в одном из полей. На
+    PostgreSQL условие обслуживает GIN-индекс pg_trgm по UPPER(поле),
+    а результаты сортируются по триграммной похожести на запрос; на
+    других базах остаётся только фильтр.
+    """
+    for term in terms:
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f'{field}__icontains': term})
+        queryset = queryset.filter(condition)
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset
+    from django.contrib.postgres.search import TrigramSimilarity
+
+    phrase = ' '.join(terms)
+    ranks = [TrigramSimilarity(field, phrase) for field in fields]
+    return queryset.annotate(
+        search_rank=Greatest(*ranks) if len(ranks) > 1 else ranks[0]
+    ).order_by('-search_rank', 'pk')
+
+
+class RankedSearchFilter(SearchFilter):
+    """SearchFilter на общем движке поиска search_queryset."""
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+        if any(field[0] in self.lookup_prefixes for field in search_fields):
+            return super().filter_queryset(request, queryset, view)
+        return search_queryset(queryset, search_fields, search_terms)
+
+
 class TitleFilter(filters.FilterSet):
     genre = filters.CharFilter(field_name='genre__slug')
     category = filters.CharFilter(field_name='category__slug')
     year = filters.NumberFilter(field_name='year')
-    name = filters.CharFilter(field_name='name', lookup_expr='contains')
+    name = filters.CharFilter(method='filter_name')
 
     class Meta:
         model = Title
         fields = '__all__'
+
+    def filter_name(self, queryset, name, value):
+        return search_queryset(queryset, (name,), value.split())
@@ -0,0 +1,219 @@
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from api.benchmarks import summarize
+from custom_user.models import User
+from reviews.models import Category, Genre, Review, Title
+from reviews.synthetic import seed_dataset
+
+SCENARIOS = ('signup', 'token', 'titles', 'titles_filtered', 'title',
+             'reviews', 'comments')
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест эндпоинтов api/v1 на синтетических данных: '
+        'задержка p50/p95/p99, запросов к базе на запрос и пропускная '
+        'способность, при необходимости в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true',
+                            help='Сначала заполнить базу синтетикой')
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=2000)
+        parser.add_argument('--reviews', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=40000)
+        parser.add_argument('--random-seed', type=int, default=0)
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Запросов на сценарий')
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument(
+            '--scenarios', default=','.join(SCENARIOS),
+            help=f'Через запятую из: {", ".join(SCENARIOS)}'
+        )
+        parser.add_argument(
+            '--url', help='Адрес запущенного сервера (например, gunicorn '
+                          'на http://127.0.0.1:8000) вместо тестового '
+                          'клиента; число запросов к базе тогда не '
+                          'считается'
+        )
+        parser.add_argument('--output', help='Файл для результатов в JSON')
+
+    def handle(self, *args, **options):
+        scenarios = options['scenarios'].split(',')
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные сценарии: {", ".join(sorted(unknown))}'
+            )
+        if options['requests'] < 1:
+            raise CommandError('--requests должен быть больше 0.')
+        if options['seed']:
+            seed_dataset(
+                users=options['users'], categories=options['categories'],
+                genres=options['genres'], titles=options['titles'],
+                reviews=options['reviews'], comments=options['comments'],
+                seed=options['random_seed'], stdout=self.stdout
+            )
+        self.rng = random.Random(options['random_seed'])
+        self.prepare_targets()
+        send = self.http if options['url'] else self.in_process
+        self.url = (options['url'] or '').rstrip('/')
+        self.client = Client()
+        results = {}
+        for name in scenarios:
+            make_request = getattr(self, f'scenario_{name}')
+            for number in range(options['warmup']):
+                send(*make_request(number), number)
+            results[name] = self.run(
+                send, make_request, options['warmup'], options['requests']
+            )
+            self.stdout.write(self.format_result(name, results[name]))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'mode': 'http' if options['url'] else 'test-client',
+                    'dataset': self.dataset(),
+                    'requests': options['requests'],
+                    'results': results,
+                }, file, ensure_ascii=False, indent=2)
+
+    def prepare_targets(self):
+        self.title_ids = list(Title.objects.values_list('id', flat=True))
+        if not self.title_ids:
+            raise CommandError('Нет данных: запустите команду с --seed.')
+        self.popular_title_ids = list(
+            Title.objects.order_by('-reviews_count')
+            .values_list('id', flat=True)[:20]
+        )
+        self.review_paths = [
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+            for review_id, title_id in Review.objects.annotate(
+                comments_count=Count('comments')
+            ).order_by('-comments_count').values_list('id', 'title_id')[:50]
+        ]
+        self.genre_slugs = list(Genre.objects.values_list('slug', flat=True))
+        self.category_slugs = list(
+            Category.objects.values_list('slug', flat=True)
+        )
+        self.credentials = list(
+            User.objects.filter(is_active=True)
+            .values_list('username', 'confirmation_code')[:1000]
+        )
+
+    def dataset(self):
+        return {
+            'users': User.objects.count(),
+            'titles': len(self.title_ids),
+            'reviews': Review.objects.count(),
+        }
+
+    def scenario_signup(self, number):
+        username = f'bench{time.time_ns()}x{number}'
+        return 'POST', '/api/v1/auth/signup/', {
+            'username': username, 'email': f'{username}@example.com'
+        }
+
+    def scenario_token(self, number):
+        username, code = self.credentials[number % len(self.credentials)]
+        return 'POST', '/api/v1/auth/token/', {
+            'username': username, 'confirmation_code': str(code)
+        }
+
+    def scenario_titles(self, number):
+        return 'GET', f'/api/v1/titles/?page={number % 20 + 1}', None
+
+    def scenario_titles_filtered(self, number):
+        params = [f'genre={self.rng.choice(self.genre_slugs)}']
+        if self.category_slugs and number % 2:
+            params.append(f'category={self.rng.choice(self.category_slugs)}')
+        return 'GET', f'/api/v1/titles/?{"&".join(params)}', None
+
+    def scenario_title(self, number):
+        title_id = self.rng.choice(self.title_ids)
+        return 'GET', f'/api/v1/titles/{title_id}/', None
+
+    def scenario_reviews(self, number):
+        # Половина запросов — к популярным произведениям с длинными лентами.
+        ids = self.popular_title_ids if number % 2 else self.title_ids
+        return 'GET', f'/api/v1/titles/{self.rng.choice(ids)}/reviews/', None
+
+    def scenario_comments(self, number):
+        if not self.review_paths:
+            raise CommandError('Нет отзывов для сценария comments.')
+        return 'GET', self.rng.choice(self.review_paths), None
+
+    def in_process(self, method, path, data, number):
+        # Свой адрес на каждый запрос, чтобы ограничение частоты выдачи
+        # токенов не искажало замер.
+        address = f'10.{number >> 16 & 255}.{number >> 8 & 255}.{number & 255}'
+        with ExitStack() as stack:
+            captures = [
+                stack.enter_context(CaptureQueriesContext(connection))
+                for connection in connections.all()
+            ]
+            if method == 'GET':
+                response = self.client.get(path, REMOTE_ADDR=address)
+            else:
+                response = self.client.post(
+                    path, data=json.dumps(data),
+                    content_type='application/json', REMOTE_ADDR=address
+                )
+        return response.status_code, sum(map(len, captures))
+
+    def http(self, method, path, data, number):
+        request = urllib.request.Request(
+            self.url + path, method=method,
+            data=json.dumps(data).encode() if data is not None else None,
+            headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status, None
+        except urllib.error.HTTPError as error:
+            return error.code, None
+
+    def run(self, send, make_request, offset, requests):
+        latencies = []
+        queries = []
+        statuses = Counter()
+        started = time.perf_counter()
+        for number in range(offset, offset + requests):
+            method, path, data = make_request(number)
+            request_started = time.perf_counter()
+            status, count = send(method, path, data, number)
+            latencies.append(time.perf_counter() - request_started)
+            statuses[str(status)] += 1
+            if count is not None:
+                queries.append(count)
+        result = summarize(latencies, time.perf_counter() - started)
+        result['queries_per_request'] = (
+            round(sum(queries) / len(queries), 2) if queries else None
+        )
+        result['statuses'] = dict(statuses)
+        return result
+
+    @staticmethod
+    def format_result(name, result):
+        queries = result['queries_per_request']
+        return (
+            f'{name}: p50 {result["p50_ms"]} мс, p95 {result["p95_ms"]} мс, '
+            f'p99 {result["p99_ms"]} мс, {result["throughput"]} запр/с, '
+            f'запросов к базе {queries if queries is not None else "—"}, '
+            f'ответы {result["statuses"]}'
+        )
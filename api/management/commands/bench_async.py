@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from api.asynchronous import AsyncViewsHandler
+from api.benchmarks import format_summary, summarize
+from reviews.models import Comment
+
+
+async def asgi_get(application, path):
+    """GET-запрос к ASGI-приложению; возвращает статус и тело ответа."""
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 0),
+        'server': ('testserver', 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return messages[0]['status'], body
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает синхронные и асинхронные представления под ASGI: '
+        'проверяет совпадение ответов и измеряет задержку при '
+        'одновременных запросах'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument(
+            '--db-latency', type=float, default=0,
+            help='Искусственная задержка каждого запроса к базе в мс, '
+                 'как у сетевого PostgreSQL'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError(
+                '--requests и --concurrency должны быть больше 0.'
+            )
+        comment = Comment.objects.select_related('review').first()
+        if comment is None:
+            raise CommandError(
+                'Нужен хотя бы один комментарий: заполните базу, например, '
+                'командой explain_hot_paths --seed.'
+            )
+        title_id, review_id = comment.review.title_id, comment.review_id
+        paths = [
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title_id}/',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+        ]
+        if options['db_latency'] > 0:
+            self.add_db_latency(options['db_latency'] / 1000)
+        applications = {
+            'sync': ASGIHandler(),
+            'async': AsyncViewsHandler(),
+        }
+        asyncio.run(self.compare(applications, paths))
+        for name, application in applications.items():
+            summary = asyncio.run(self.load(application, paths, options))
+            self.stdout.write(f'{name}: {format_summary(summary)}')
+
+    @staticmethod
+    def add_db_latency(seconds):
+        def delay(execute, sql, params, many, context):
+            time.sleep(seconds)
+            return execute(sql, params, many, context)
+
+        def install(sender, connection, **kwargs):
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        # Соединения потоков пула открываются позже и получают задержку
+        # через сигнал.
+        connection_created.connect(install, weak=False)
+        for connection in connections.all():
+            install(None, connection)
+
+    async def compare(self, applications, paths):
+        for path in paths:
+            sync, async_ = [
+                await asgi_get(application, path)
+                for application in applications.values()
+            ]
+            if sync != async_:
+                raise CommandError(f'Ответы на {path} различаются.')
+        self.stdout.write(f'Ответы совпадают для {len(paths)} адресов.')
+
+    @staticmethod
+    async def load(application, paths, options):
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        latencies = []
+
+        async def request(number):
+            async with semaphore:
+                started = time.perf_counter()
+                await asgi_get(application, paths[number % len(paths)])
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*map(request, range(options['requests'])))
+        return summarize(latencies, time.perf_counter() - started)
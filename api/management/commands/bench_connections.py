@@ -0,0 +1,124 @@
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import (DEFAULT_DB_ALIAS, close_old_connections,
+                       connections)
+from django.db.backends.signals import connection_created
+from django.test import Client
+
+from api.benchmarks import format_summary, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест соединений с базой: сравнивает задержку запросов '
+        'при разных CONN_MAX_AGE в этом процессе или измеряет запущенный '
+        'сервер по --url'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/v1/titles/1/reviews/')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument(
+            '--max-age', default='0,60',
+            help='Значения CONN_MAX_AGE через запятую'
+        )
+        parser.add_argument(
+            '--url', help='Адрес запущенного сервера, например '
+                          'http://127.0.0.1:8000; настройки соединений '
+                          'тогда задаются переменными окружения сервера'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['threads'] < 1:
+            raise CommandError('--requests и --threads должны быть больше 0.')
+        if options['url']:
+            url = options['url'].rstrip('/')
+            summary, _ = self.run(
+                lambda: self.fetcher(url), options, options['path']
+            )
+            self.stdout.write(
+                f'{url}{options["path"]}: {format_summary(summary)}'
+            )
+            return
+        try:
+            ages = [int(age) for age in options['max_age'].split(',')]
+        except ValueError:
+            raise CommandError('--max-age: ожидались целые числа.')
+        settings_dict = connections.settings[DEFAULT_DB_ALIAS]
+        saved = settings_dict['CONN_MAX_AGE']
+        try:
+            for age in ages:
+                settings_dict['CONN_MAX_AGE'] = age
+                summary, opened = self.run(
+                    self.in_process, options, options['path']
+                )
+                self.stdout.write(
+                    f'CONN_MAX_AGE={age}: {format_summary(summary)}, '
+                    f'новых соединений {opened}'
+                )
+        finally:
+            settings_dict['CONN_MAX_AGE'] = saved
+
+    @staticmethod
+    def in_process():
+        # Тестовый клиент отключает закрытие соединений в начале и конце
+        # запроса; здесь оно возвращено, как в обработчике WSGI.
+        client = Client()
+
+        def request(path):
+            close_old_connections()
+            client.get(path)
+            close_old_connections()
+        return request
+
+    @staticmethod
+    def fetcher(url):
+        def fetch(path):
+            with urllib.request.urlopen(url + path) as response:
+                response.read()
+        return fetch
+
+    def run(self, make_request, options, path=''):
+        """Выполняет запросы в потоках, возвращает сводку и число
+        открытых соединений с базой.
+
+        make_request вызывается в каждом потоке и возвращает функцию,
+        выполняющую один запрос к path.
+        """
+        opened = []
+        lock = threading.Lock()
+
+        def count(sender, connection, **kwargs):
+            with lock:
+                opened.append(connection.alias)
+
+        def work(number):
+            request = make_request()
+            latencies = []
+            try:
+                for _ in range(number):
+                    started = time.perf_counter()
+                    request(path)
+                    latencies.append(time.perf_counter() - started)
+            finally:
+                connections.close_all()
+            return latencies
+
+        total, threads = options['requests'], options['threads']
+        shares = [total // threads + (i < total % threads)
+                  for i in range(threads)]
+        connection_created.connect(count)
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(threads) as executor:
+                results = list(executor.map(work, shares))
+            elapsed = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(count)
+        latencies = [value for result in results for value in result]
+        return summarize(latencies, elapsed), len(opened)
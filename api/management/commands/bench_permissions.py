@@ -0,0 +1,58 @@
+import itertools
+import time
+from types import SimpleNamespace
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.permissions import (IsAdmin, IsAdminModeratorOwnerOrReadOnly,
+                             IsAdminOrReadOnly,
+                             IsAuthorAdminModeratorOrReadOnly, UserPermission)
+from custom_user.models import User
+from reviews.models import Review
+
+PERMISSIONS = (UserPermission, IsAdminOrReadOnly, IsAdmin,
+               IsAdminModeratorOwnerOrReadOnly,
+               IsAuthorAdminModeratorOrReadOnly)
+METHODS = ('GET', 'GET', 'GET', 'POST', 'PATCH', 'DELETE')
+
+
+class Command(BaseCommand):
+    help = (
+        'Микробенчмарк классов разрешений на смеси безопасных и '
+        'изменяющих запросов; объекты не загружают автора из базы'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100000)
+
+    def handle(self, *args, **options):
+        users = [AnonymousUser()] + [
+            User(id=pk, username=f'bench{pk}', role=role)
+            for pk, role in enumerate(
+                (User.USER, User.MODERATOR, User.ADMIN), start=1
+            )
+        ]
+        # Отзывы с одним author_id, как после выборки без select_related.
+        objects = [Review(id=pk, author_id=pk) for pk in range(1, 4)]
+        cases = list(itertools.product(METHODS, users, objects))
+        for permission_class in PERMISSIONS:
+            permission = permission_class()
+            requests = [
+                (SimpleNamespace(method=method, user=user), obj)
+                for method, user, obj in cases
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for request, obj in itertools.islice(
+                        itertools.cycle(requests), options['iterations']):
+                    if permission.has_permission(request, None):
+                        permission.has_object_permission(request, None, obj)
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{permission_class.__name__}: '
+                f'{elapsed / options["iterations"] * 1e9:.0f} нс/проверку, '
+                f'запросов к базе: {len(queries)}'
+            )
@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.fast_serializers import (FastCommentSerializer, FastReviewSerializer,
+                                  FastTitleSerializer)
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleReadSerializer)
+from reviews.models import Comment, Review, Title
+
+CASES = {
+    'titles': (
+        Title.objects.select_related('category').prefetch_related('genre')
+        .order_by('id'),
+        TitleReadSerializer, FastTitleSerializer,
+    ),
+    'reviews': (
+        Review.objects.select_related('author').order_by('pub_date', 'id'),
+        ReviewSerializer, FastReviewSerializer,
+    ),
+    'comments': (
+        Comment.objects.select_related('author').order_by('pub_date', 'id'),
+        CommentSerializer, FastCommentSerializer,
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает сериализаторы DRF и быстрый путь из values() на '
+        'произведениях, отзывах и комментариях: объектов в секунду и '
+        'побайтовое совпадение JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=500,
+                            help='Объектов в одном списке')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        limit, repeat = options['limit'], options['repeat']
+        if limit < 1 or repeat < 1:
+            raise CommandError('--limit и --repeat должны быть больше 0.')
+        renderer = JSONRenderer()
+        for name, (queryset, serializer_class, fast_class) in CASES.items():
+            fast = fast_class()
+
+            def drf_path():
+                return serializer_class(queryset[:limit], many=True).data
+
+            def fast_path():
+                return fast.serialize(fast.rows(queryset)[:limit])
+
+            drf_data = drf_path()
+            if not drf_data:
+                self.stdout.write(f'{name}: нет данных')
+                continue
+            if renderer.render(drf_data) != renderer.render(fast_path()):
+                raise CommandError(f'{name}: ответы различаются.')
+            drf_rate = self.measure(drf_path, len(drf_data), repeat)
+            fast_rate = self.measure(fast_path, len(drf_data), repeat)
+            self.stdout.write(
+                f'{name}: DRF {drf_rate:.0f} объектов/с, быстрый путь '
+                f'{fast_rate:.0f} объектов/с (x{fast_rate / drf_rate:.1f}), '
+                f'JSON совпадает'
+            )
+
+    @staticmethod
+    def measure(serialize, count, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            serialize()
+        return count * repeat / (time.perf_counter() - started)
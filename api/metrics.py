@@ -0,0 +1,175 @@
+"""Метрики производительности запросов в памяти процесса.
+
+Middleware заводит на каждый отобранный запрос объект RequestStats и
+кладёт его в контекстную переменную; обёртка выполнения SQL и
+сериализаторы добавляют в него своё время. По завершении запроса значения
+попадают в гистограммы с метками маршрута и метода, которые отдаются в
+текстовом формате Prometheus.
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Сколько запросов SQL хранится для журнала медленных запросов.
+MAX_CAPTURED_QUERIES = 1000
+
+current_stats = ContextVar('current_stats', default=None)
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.captured = []
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        if len(self.captured) < MAX_CAPTURED_QUERIES:
+            self.captured.append((duration, sql))
+
+    def slowest_queries(self, limit):
+        return sorted(self.captured, key=lambda query: query[0],
+                      reverse=True)[:limit]
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка выполнения SQL (connection.execute_wrapper)."""
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add_query(sql, time.perf_counter() - started)
+
+
+def timed_representation(to_representation):
+    """Добавляет время сериализации к статистике текущего запроса."""
+    def wrapper(instance):
+        stats = current_stats.get()
+        if stats is None:
+            return to_representation(instance)
+        started = time.perf_counter()
+        try:
+            return to_representation(instance)
+        finally:
+            stats.serializer_time += time.perf_counter() - started
+    return wrapper
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        counts, total = self.series.get(labels, (None, 0.0))
+        if counts is None:
+            counts = [0] * (len(self.buckets) + 1)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.series[labels] = (counts, total + value)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}',
+                 f'# TYPE {self.name} histogram']
+        for labels, (counts, total) in sorted(self.series.items()):
+            label_text = format_labels(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket{{{label_text},le="{bound}"}} '
+                    f'{cumulative}'
+                )
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return lines
+
+
+def format_labels(labels):
+    return ','.join(
+        f'{name}="{value}"'
+        for name, value in zip(('route', 'method'), labels)
+    )
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.cache_lookups = {'hit': 0, 'miss': 0}
+        self.histograms = (
+            Histogram('api_request_duration_seconds',
+                      'Полное время обработки запроса.', LATENCY_BUCKETS),
+            Histogram('api_db_queries', 'Число запросов к базе за запрос.',
+                      COUNT_BUCKETS),
+            Histogram('api_db_duration_seconds',
+                      'Время запросов к базе за запрос.', LATENCY_BUCKETS),
+            Histogram('api_serializer_duration_seconds',
+                      'Время сериализации ответа.', LATENCY_BUCKETS),
+            Histogram('api_response_size_bytes',
+                      'Размер тела ответа.', SIZE_BUCKETS),
+        )
+
+    def observe(self, route, method, status, stats, latency, size):
+        labels = (route, method)
+        values = (latency, stats.queries, stats.db_time,
+                  stats.serializer_time, size)
+        with self.lock:
+            key = labels + (str(status),)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            for histogram, value in zip(self.histograms, values):
+                if value is not None:
+                    histogram.observe(labels, value)
+
+    def count_cache_lookup(self, hit):
+        with self.lock:
+            self.cache_lookups['hit' if hit else 'miss'] += 1
+
+    def cache_stats(self):
+        with self.lock:
+            return {'hits': self.cache_lookups['hit'],
+                    'misses': self.cache_lookups['miss']}
+
+    def render(self):
+        lines = ['# HELP api_requests_total Число отобранных запросов.',
+                 '# TYPE api_requests_total counter']
+        with self.lock:
+            for (route, method, status), count in sorted(
+                    self.requests.items()):
+                lines.append(
+                    f'api_requests_total{{{format_labels((route, method))},'
+                    f'status="{status}"}} {count}'
+                )
+            lines.extend([
+                '# HELP api_cache_lookups_total Обращения к кэшу ответов.',
+                '# TYPE api_cache_lookups_total counter',
+            ])
+            for result, count in sorted(self.cache_lookups.items()):
+                lines.append(
+                    f'api_cache_lookups_total{{result="{result}"}} {count}'
+                )
+            for histogram in self.histograms:
+                lines.extend(histogram.render())
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self.lock:
+            self.requests.clear()
+            self.cache_lookups = {'hit': 0, 'miss': 0}
+            for histogram in self.histograms:
+                histogram.series.clear()
+
+
+registry = Registry()
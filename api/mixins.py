@@ -1,8 +1,239 @@
-from rest_framework import mixins, viewsets
+import time
+from itertools import islice
 
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Max, prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
 
-class ListCreateDestroyViewSet(mixins.ListModelMixin,
+from api_yamdb.routers import use_primary
+from .bulk import get_batch_size
+from .cache import (count_hit, get_cache, get_generation, is_fresh,
+                    make_etag, normalized_query, response_cache_key)
+from .metrics import timed_representation
+from .parsers import NDJSONParser
+
+
+class SerializerTimingMixin:
+    """Учитывает время сериализации ответа в метриках запроса."""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        serializer.to_representation = timed_representation(
+            serializer.to_representation
+        )
+        return serializer
+
+
+class FastReadMixin:
+    """Отдаёт список через быстрый сериализатор из values().
+
+    Включается настройкой FAST_READ_SERIALIZERS; ответ совпадает с
+    ответом обычного сериализатора.
+    """
+    fast_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_READ_SERIALIZERS:
+            return super().list(request, *args, **kwargs)
+        serializer = self.fast_serializer_class()
+        rows = serializer.rows(self.filter_queryset(self.get_queryset()))
+        serialize = timed_representation(serializer.serialize)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serialize(page))
+        return Response(serialize(rows))
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class StreamingListMixin:
+    """Отдаёт большие страницы списка потоком JSON.
+
+    Если запрошено не меньше STREAMING_LIST_THRESHOLD элементов, страница
+    читается из базы и сериализуется частями по STREAMING_CHUNK_SIZE, так
+    что в памяти одновременно только одна часть. Тело ответа совпадает с
+    обычным. Под ASGI, в курсорном режиме и для браузерного API список
+    отдаётся как обычно.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if (isinstance(request._request, ASGIRequest)
+                or request.accepted_renderer.format != 'json'
+                or self.paginator is None):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginator.lazy_page(queryset, request, self)
+        if page is None:
+            return super().list(request, *args, **kwargs)
+        # База выбирается сейчас: после возврата ответа маршрутизатор уже
+        # не знает, что это чтение безопасного запроса.
+        page = page.using(page.db)
+        return StreamingHttpResponse(
+            self.stream_page(page, self.paginator.get_envelope()),
+            content_type=request.accepted_renderer.media_type
+        )
+
+    def stream_page(self, page, envelope):
+        render = self.request.accepted_renderer.render
+        yield render(envelope)[:-1] + b',"results":['
+        first = True
+        for items in self.serialize_chunks(page):
+            if not items:
+                continue
+            yield (b'' if first else b',') + render(items)[1:-1]
+            first = False
+        yield b']}'
+
+    def serialize_chunks(self, page):
+        size = settings.STREAMING_CHUNK_SIZE
+        fast_serializer_class = getattr(self, 'fast_serializer_class', None)
+        if settings.FAST_READ_SERIALIZERS and fast_serializer_class:
+            serializer = fast_serializer_class()
+            for rows in chunked(
+                    serializer.rows(page).iterator(chunk_size=size), size):
+                yield serializer.serialize(rows)
+            return
+        # iterator() не выполняет prefetch_related, поэтому связи
+        # подгружаются отдельно для каждой части.
+        lookups = page._prefetch_related_lookups
+        for objects in chunked(page.iterator(chunk_size=size), size):
+            prefetch_related_objects(objects, *lookups)
+            yield self.get_serializer(objects, many=True).data
+
+
+class ListCreateDestroyViewSet(SerializerTimingMixin,
+                               mixins.ListModelMixin,
                                mixins.CreateModelMixin,
                                mixins.DestroyModelMixin,
                                viewsets.GenericViewSet):
     pass
+
+
+class CachedResponseMixin:
+    """Кэширует ответы list и retrieve до изменения данных.
+
+    Ключ строится из пути, нормализованной строки запроса и поколения
+    данных cache_namespace, которое сдвигается сигналами при записи.
+    Пока поколение свежее, ответ для кэша читается из основной базы.
+    """
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        generation = get_generation(self.cache_namespace)
+        key = response_cache_key(
+            self.cache_namespace, generation, request
+        )
+        entry = cache.get(key)
+        count_hit(entry is not None)
+        if entry is None:
+            if is_fresh(generation):
+                use_primary()
+            response = handler(request, *args, **kwargs)
+            if (response.status_code != status.HTTP_200_OK
+                    or response.streaming):
+                return response
+            entry = (make_etag(response.data), response.data)
+            cache.set(key, entry)
+            response['X-Cache'] = 'MISS'
+        else:
+            response = Response(entry[1])
+            response['X-Cache'] = 'HIT'
+        etag = quote_etag(entry[0])
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response['ETag'] = etag
+        return response
+
+
+class ConditionalListMixin:
+    """Отвечает 304 на повторный запрос неизменившегося списка.
+
+    Валидатор строится одним агрегатом по отфильтрованному queryset:
+    последние правки записей и их авторов, последний id и число строк.
+    Удаление видно только по ETag: Last-Modified от него не сдвигается.
+    Пока последней правке меньше секунды, Last-Modified не отдаётся,
+    иначе правка в ту же секунду ответила бы 304 на If-Modified-Since.
+    """
+
+    def list(self, request, *args, **kwargs):
+        stats = self.filter_queryset(self.get_queryset()).aggregate(
+            last_updated=Max('updated_at'),
+            last_author_updated=Max('author__updated_at'),
+            last_id=Max('id'), count=Count('id')
+        )
+        etag = quote_etag(make_etag([
+            stats['last_updated'], stats['last_author_updated'],
+            stats['last_id'], stats['count'], normalized_query(request)
+        ]))
+        changes = [
+            value.timestamp()
+            for value in (stats['last_updated'],
+                          stats['last_author_updated'])
+            if value is not None
+        ]
+        last_modified = int(max(changes)) if changes else None
+        if changes and time.time() - max(changes) < 1:
+            last_modified = None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class BulkUpsertMixin:
+    """Пакетная загрузка: POST <список>/bulk/ с JSON-массивом или NDJSON.
+
+    Элементы обрабатываются функцией upsert_function(items, batch_size)
+    пачками по batch_size, каждая в своей транзакции; ошибки возвращаются
+    по индексам элементов. В запросе не больше BULK_MAX_ITEMS элементов.
+    """
+    upsert_function = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.upsert_function is None:
+            raise ImproperlyConfigured(
+                f'{cls.__name__}: не задан upsert_function.'
+            )
+
+    @action(detail=False, methods=['post'], url_path='bulk',
+            parser_classes=(JSONParser, NDJSONParser))
+    def bulk(self, request):
+        if not isinstance(request.data, list):
+            raise ParseError('Ожидался массив объектов.')
+        if len(request.data) > settings.BULK_MAX_ITEMS:
+            raise ParseError(
+                f'Не больше {settings.BULK_MAX_ITEMS} элементов.'
+            )
+        result = self.upsert_function(request.data, get_batch_size(request))
+        return Response(result.data, status=status.HTTP_200_OK)
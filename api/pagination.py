@@ -0,0 +1,107 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from rest_framework.pagination import (CursorPagination, LimitOffsetPagination,
+                                       PageNumberPagination)
+
+
+class CursorSwitchMixin:
+    """Переключает пагинацию на курсорную по запросу клиента.
+
+    Курсорный режим включается параметром ?pagination=cursor или
+    переданным курсором. В нём не считается COUNT(*) и не используется
+    OFFSET, поэтому глубокие страницы отдаются так же быстро, как первая.
+    """
+    cursor_ordering = ('id',)
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or CursorPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if not self.use_cursor(request):
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_paginator = CursorPagination()
+        self.cursor_paginator.ordering = self.cursor_ordering
+        return self.cursor_paginator.paginate_queryset(
+            queryset, request, view
+        )
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def lazy_page(self, queryset, request, view=None):
+        """Большая страница без загрузки в память для потоковой отдачи.
+
+        Возвращает невычисленный queryset страницы, если запрошено не
+        меньше STREAMING_LIST_THRESHOLD элементов, иначе None; заголовок
+        ответа затем строит get_envelope().
+        """
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            return None
+        size = self.get_requested_size(request)
+        if size is None or size < settings.STREAMING_LIST_THRESHOLD:
+            return None
+        return self.slice_page(queryset, request, size)
+
+
+class TitlePagination(CursorSwitchMixin, PageNumberPagination):
+    cursor_ordering = ('id',)
+    page_size_query_param = 'limit'
+    max_page_size = settings.MAX_PAGE_SIZE
+
+    def get_requested_size(self, request):
+        return self.get_page_size(request)
+
+    def slice_page(self, queryset, request, size):
+        paginator = self.django_paginator_class(queryset, size)
+        try:
+            self.page = paginator.page(
+                self.get_page_number(request, paginator)
+            )
+        except InvalidPage:
+            # Ошибку вернёт обычная пагинация.
+            return None
+        self.request = request
+        return self.page.object_list
+
+    def get_envelope(self):
+        return OrderedDict([
+            ('count', self.page.paginator.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
+
+
+class PubDatePagination(CursorSwitchMixin, LimitOffsetPagination):
+    cursor_ordering = ('pub_date', 'id')
+    max_limit = settings.MAX_PAGE_SIZE
+
+    def get_requested_size(self, request):
+        return self.get_limit(request)
+
+    def slice_page(self, queryset, request, size):
+        self.limit = size
+        self.count = self.get_count(queryset)
+        self.offset = self.get_offset(request)
+        self.request = request
+        if self.count == 0 or self.offset > self.count:
+            return queryset.none()
+        return queryset[self.offset:self.offset + self.limit]
+
+    def get_envelope(self):
+        return OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
@@ -0,0 +1,32 @@
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """Разбирает тело из JSON-объектов по одному на строку в список.
+
+    Строк больше BULK_MAX_ITEMS не читает: тело не разбирается целиком
+    только для того, чтобы быть отвергнутым.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        items = []
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if len(items) >= settings.BULK_MAX_ITEMS:
+                raise ParseError(
+                    f'Не больше {settings.BULK_MAX_ITEMS} элементов.'
+                )
+            try:
+                items.append(json.loads(line.decode(encoding)))
+            except ValueError as exc:
+                raise ParseError(f'Строка {number}: {exc}')
+        return items
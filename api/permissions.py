@@ -1,6 +1,7 @@
-from rest_framework.permissions import SAFE_METHODS, BasePermission
+import hmac
 
-from custom_user.models import User
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS, BasePermission
 
 
 class UserPermission(BasePermission):
@@ -8,7 +9,7 @@ class UserPermission(BasePermission):
     def has_permission(self, request, view):
         return request.user.is_authenticated
 
-    def has_object_permission(self, view, request, obj):
+    def has_object_permission(self, request, view, obj):
         return request.method in ('PATCH', 'GET')
 
 
@@ -18,8 +19,7 @@ class IsAdminOrReadOnly(BasePermission):
         return (
             request.method in SAFE_METHODS
             or request.user.is_authenticated
-            and request.user.role == User.ADMIN
-            or request.user.is_superuser
+            and (request.user.is_admin or request.user.is_superuser)
         )
 
 
@@ -28,9 +28,9 @@ class IsAdmin(BasePermission):
     def has_permission(self, request, view):
         return (
             request.user.is_authenticated
-            and request.user.role == User.ADMIN
-            or request.user.is_staff
-            or request.user.is_superuser
+            and (request.user.is_admin
+                 or request.user.is_staff
+                 or request.user.is_superuser)
         )
 
     def has_object_permission(self, request, view, obj):
@@ -44,9 +44,9 @@ class IsAdminModeratorOwnerOrReadOnly(BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return (request.method in SAFE_METHODS
+                or obj.author_id == request.user.pk
                 or request.user.is_admin
-                or request.user.is_moderator
-                or obj.author == request.user)
+                or request.user.is_moderator)
 
 
 class IsAuthorAdminModeratorOrReadOnly(BasePermission):
@@ -58,9 +58,47 @@ class IsAuthorAdminModeratorOrReadOnly(BasePermission):
         if request.method == 'POST':
             return request.user.is_authenticated
 
+        # author_id сравнивается без загрузки автора из базы.
         return request.user.is_authenticated and (
-            request.user == obj.author
-            or request.user.role == User.MODERATOR
-            or request.user.role == User.ADMIN
+            obj.author_id == request.user.pk
+            or request.user.is_moderator
+            or request.user.is_admin
             or request.user.is_superuser
         )
+
+
+class IsAdminOrModerator(BasePermission):
+    """Разрешения для пакетной модерации отзывов и комментариев"""
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and (
+            request.user.is_moderator
+            or request.user.is_admin
+            or request.user.is_superuser
+        )
+
+
+class MetricsPermission(IsAdmin):
+    """Метрики доступны администратору и сборщику с токеном.
+
+    Сборщик передаёт заголовок Authorization: Token <API_METRICS_TOKEN>.
+    Без токена пускаются только адреса из ALLOWED_IPS (по умолчанию
+    никакие): за обратным прокси на том же хосте все клиенты приходят
+    с 127.0.0.1.
+    """
+    def has_permission(self, request, view):
+        return (
+            self.has_scrape_token(request)
+            or request.META.get('REMOTE_ADDR')
+            in settings.API_METRICS['ALLOWED_IPS']
+            or super().has_permission(request, view)
+        )
+
+    @staticmethod
+    def has_scrape_token(request):
+        token = settings.API_METRICS['TOKEN']
+        scheme, _, credentials = request.headers.get(
+            'Authorization', ''
+        ).partition(' ')
+        return bool(token) and scheme == 'Token' and hmac.compare_digest(
+            credentials.encode(), token.encode()
+        )
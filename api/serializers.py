@@ -1,9 +1,14 @@
 from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from custom_user.models import User
 from reviews.models import Category, Comment, Genre, Review, Title
 
+DUPLICATE_REVIEW = 'Вы уже оставили отзыв на данное произведение'
+
 
 class GetTokenSerializer(serializers.Serializer):
     username = serializers.CharField(required=True)
@@ -27,17 +32,21 @@ class SignUpSerializer(serializers.Serializer):
         return value
 
     def validate(self, data):
-        if_username = User.objects.filter(username=data['username']).exists()
-        if_email = User.objects.filter(email=data['email']).exists()
-        if data['username'].lower() == 'me':
-            raise serializers.ValidationError('недопустимое имя пользователя')
-        if User.objects.filter(username=data['username'],
-                               email=data['email']).exists():
-            return data
-        if (if_username or if_email):
-            raise serializers.ValidationError('Почта занята')
+        self.existing_user = None
+        for user in User.objects.filter(
+            Q(username=data['username']) | Q(email=data['email'])
+        )[:2]:
+            if (user.username != data['username']
+                    or user.email != data['email']):
+                raise serializers.ValidationError('Почта занята')
+            self.existing_user = user
         return data
 
+    def create(self, validated_data):
+        if self.existing_user is not None:
+            return self.existing_user
+        return User.objects.create(**validated_data)
+
     class Meta:
         model = User
         fields = ('email', 'username')
@@ -89,9 +98,7 @@ class CategorySerializer(serializers.ModelSerializer):
 
 class TitleReadSerializer(serializers.ModelSerializer):
     """Сериализатор для произведений(чтение)"""
-    rating = serializers.IntegerField(
-        source='reviews__score__avg', read_only=True
-    )
+    rating = serializers.IntegerField(read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
 
@@ -126,19 +133,16 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'score', 'pub_date')
         model = Review
 
-    def validate(self, data):
-        if self.context['request'].method != 'POST':
-            return data
-
-        user = self.context['request'].user
-        title_id = (
-            self.context['request'].parser_context['kwargs']['title_id']
-        )
-        if Review.objects.filter(author=user, title__id=title_id).exists():
+    def create(self, validated_data):
+        # Повторный отзыв отсекает ограничение unique_review в базе,
+        # без отдельной проверки перед вставкой.
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
             raise serializers.ValidationError(
-                'Вы уже оставили отзыв на данное произведение'
+                {api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_REVIEW]}
             )
-        return data
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -148,3 +152,27 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ('id', 'text', 'author', 'pub_date')
         model = Comment
+
+
+class ModerationSerializer(serializers.Serializer):
+    """Условия пакетного удаления отзывов или комментариев"""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    author = serializers.SlugRelatedField(
+        slug_field='username', queryset=User.objects.all(), required=False
+    )
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError(
+                'Укажите ids, author или диапазон дат.'
+            )
+        if ('since' in data and 'until' in data
+                and data['since'] > data['until']):
+            raise serializers.ValidationError(
+                'Начало диапазона позже его конца.'
+            )
+        return data
@@ -0,0 +1,47 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from custom_user.models import User
+from reviews.models import Category, Genre, Review, Title
+from reviews.signals import catalog_loaded, reviews_purged
+from .authentication import user_cache
+from .cache import CATEGORIES, GENRES, TITLES, bump_generation
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    bump_generation(CATEGORIES, TITLES)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_changed(sender, **kwargs):
+    bump_generation(GENRES, TITLES)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_changed(sender, **kwargs):
+    bump_generation(TITLES)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(reviews_purged)
+def review_changed(sender, **kwargs):
+    bump_generation(TITLES)
+
+
+@receiver(catalog_loaded)
+def catalog_changed(sender, **kwargs):
+    # Сдвиг поколений, в отличие от очистки кэша, увидят все воркеры,
+    # если кэш API общий (см. api_yamdb.E003).
+    bump_generation(CATEGORIES, GENRES, TITLES)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    user_cache.delete(instance.pk)
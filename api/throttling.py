@@ -0,0 +1,61 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Ограничивает частоту запросов ведром токенов в памяти процесса.
+
+    Ведро заводится на IP клиента и на имя пользователя из тела запроса,
+    запрос проходит, только если токен есть в обоих. Проверка не ходит
+    в базу, поэтому поток неверных кодов отсекается до неё. Параметры
+    берутся из settings.TOKEN_RATE_LIMIT: RATE (токенов в секунду),
+    BURST (ёмкость ведра) и MAX_KEYS (сколько вёдер хранить).
+    """
+    buckets = OrderedDict()
+    lock = threading.Lock()
+
+    def __init__(self):
+        config = settings.TOKEN_RATE_LIMIT
+        self.rate = config['RATE']
+        self.burst = config['BURST']
+        self.max_keys = config['MAX_KEYS']
+        self.delay = None
+
+    def get_keys(self, request):
+        keys = [f'ip:{self.get_ident(request)}']
+        # Тело может быть не объектом: такой запрос ограничивается только
+        # по IP, а ошибку формата вернёт сериализатор.
+        if not isinstance(request.data, dict):
+            return keys
+        username = request.data.get('username')
+        if isinstance(username, str) and username:
+            keys.append(f'username:{username}')
+        return keys
+
+    def allow_request(self, request, view):
+        if not self.rate:
+            return True
+        keys = self.get_keys(request)
+        now = time.monotonic()
+        with self.lock:
+            levels = [self.refill(key, now) for key in keys]
+            if min(levels) < 1:
+                self.delay = (1 - min(levels)) / self.rate
+                return False
+            for key, level in zip(keys, levels):
+                self.buckets[key] = (level - 1, now)
+        return True
+
+    def refill(self, key, now):
+        level, updated = self.buckets.pop(key, (self.burst, now))
+        self.buckets[key] = (level, updated)
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return min(self.burst, level + (now - updated) * self.rate)
+
+    def wait(self):
+        return self.delay
@@ -1,7 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (CategoriesViewSet, CommentViewSet, GenreViewSet, GetToken,
+from .views import (CacheStats, CategoriesViewSet, CommentBatch,
+                    CommentPurge, CommentViewSet, Export, GenreViewSet,
+                    GetToken, Metrics, ReviewBatch, ReviewPurge,
                     ReviewViewSet, SignUp, TitleViewSet, UserViewSet)
 
 router = DefaultRouter()
@@ -23,5 +25,15 @@ router.register(
 urlpatterns = [
     path('v1/', include(router.urls)),
     path('v1/auth/signup/', SignUp.as_view(), name='register'),
-    path('v1/auth/token/', GetToken.as_view(), name='token')
+    path('v1/auth/token/', GetToken.as_view(), name='token'),
+    path('v1/cache/stats/', CacheStats.as_view(), name='cache-stats'),
+    path('v1/metrics/', Metrics.as_view(), name='metrics'),
+    path('v1/export/<str:resource>/', Export.as_view(), name='export'),
+    path('v1/reviews/batch/', ReviewBatch.as_view(), name='reviews-batch'),
+    path('v1/comments/batch/', CommentBatch.as_view(),
+         name='comments-batch'),
+    path('v1/moderation/reviews/', ReviewPurge.as_view(),
+         name='moderation-reviews'),
+    path('v1/moderation/comments/', CommentPurge.as_view(),
+         name='moderation-comments'),
 ]
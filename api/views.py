@@ -1,45 +1,84 @@
-from django.core.mail import EmailMessage
-from django.db.models import Avg
+from functools import partial
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from rest_framework import filters, generics, permissions, status, viewsets
+from rest_framework import generics, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import (IsAuthenticated,
+                                        IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
 
 from custom_user.models import User
-from reviews.models import Category, Genre, Review, Title
-from .filters import TitleFilter
-from .mixins import ListCreateDestroyViewSet
-from .permissions import (IsAdmin, IsAdminOrReadOnly,
-                          IsAuthorAdminModeratorOrReadOnly, UserPermission)
+from custom_user.outbox import enqueue_email
+from reviews.export import CONTENT_TYPES, RESOURCES, export_stream
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.moderation import (moderation_filter, purge_comments,
+                                purge_reviews)
+from reviews.rankings import top_rankings, trending_rankings
+from .bulk import (create_comments, create_reviews, upsert_by_slug,
+                   upsert_titles)
+from .cache import CATEGORIES, GENRES, TITLES, cache_stats
+from .fast_serializers import (FastCommentSerializer, FastReviewSerializer,
+                               FastTitleSerializer)
+from .filters import RankedSearchFilter, TitleFilter
+from .metrics import registry
+from .mixins import (BulkUpsertMixin, CachedResponseMixin,
+                     ConditionalListMixin, FastReadMixin,
+                     ListCreateDestroyViewSet, SerializerTimingMixin,
+                     StreamingListMixin)
+from .pagination import PubDatePagination, TitlePagination
+from .parsers import NDJSONParser
+from .permissions import (IsAdmin, IsAdminOrModerator, IsAdminOrReadOnly,
+                          IsAuthorAdminModeratorOrReadOnly,
+                          MetricsPermission, UserPermission)
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, GetTokenSerializer, MeSerializer,
-                          ReviewSerializer, SignUpSerializer,
+                          ModerationSerializer, ReviewSerializer,
+                          SignUpSerializer,
                           TitleReadSerializer, TitleWriteSerializer,
                           UserSerializer)
+from .throttling import TokenBucketThrottle
 
 
 class GetToken(APIView):
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (TokenBucketThrottle,)
 
     def post(self, request):
         serializer = GetTokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
 
-        try:
-            user = User.objects.get(username=data['username'])
-        except User.DoesNotExist:
+        user = User.objects.filter(username=data['username']).values(
+            jwt_settings.USER_ID_FIELD, 'confirmation_code', 'is_active'
+        ).first()
+        if user is None:
             return Response(
                 {'username': 'Пользователь отсутствует.'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        if not user['is_active']:
+            return Response(
+                {'username': 'Пользователь неактивен.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        if str(data.get('confirmation_code')) == str(user.confirmation_code):
-            token = RefreshToken.for_user(user).access_token
+        if str(data.get('confirmation_code')) == str(
+                user['confirmation_code']):
+            # Как в AccessToken.for_user, но без загрузки пользователя.
+            user_id = user[jwt_settings.USER_ID_FIELD]
+            if not isinstance(user_id, int):
+                user_id = str(user_id)
+            token = AccessToken()
+            token[jwt_settings.USER_ID_CLAIM] = user_id
             return Response(
                 {'token': str(token)},
                 status=status.HTTP_201_CREATED
@@ -55,33 +94,86 @@ class SignUp(generics.CreateAPIView):
     serializer = SignUpSerializer
     permission_classes = (permissions.AllowAny,)
 
-    @staticmethod
-    def send_email(data):
-        email = EmailMessage(body=data['email_body'], to=[data['to_email']])
-        email.send()
-
     def post(self, request):
+        try:
+            return self.sign_up(request)
+        except IntegrityError:
+            # Параллельная регистрация с теми же данными успела раньше:
+            # повторная проверка найдёт созданного пользователя
+            # или сообщит о конфликте.
+            return self.sign_up(request)
+
+    def sign_up(self, request):
         serializer = SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        username = serializer.validated_data.get('username')
-        email = serializer.validated_data.get('email')
-        user, created = User.objects.get_or_create(
-            username=username, email=email)
-        data = {
-            'email_body': f'{user.username}, {user.confirmation_code}',
-            'to_email': user.email,
-        }
-        self.send_email(data)
+        with transaction.atomic():
+            user = serializer.save()
+            enqueue_email(
+                to_email=user.email,
+                body=f'{user.username}, {user.confirmation_code}'
+            )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class CacheStats(APIView):
+    """Счётчики попаданий и промахов кэша ответов"""
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response(cache_stats(), status=status.HTTP_200_OK)
+
+
+class Metrics(APIView):
+    """Метрики запросов процесса в текстовом формате Prometheus"""
+    permission_classes = (MetricsPermission,)
+
+    def get(self, request):
+        return HttpResponse(
+            registry.render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
+
+class Export(APIView):
+    """Потоковая выгрузка каталога, отзывов и комментариев"""
+    permission_classes = (IsAdmin,)
+
+    def get(self, request, resource):
+        if resource not in RESOURCES:
+            return Response(
+                {'resource': f'Доступны: {", ".join(RESOURCES)}.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        file_format = request.query_params.get('file_format', 'ndjson')
+        if file_format not in CONTENT_TYPES:
+            return Response(
+                {'file_format': f'Доступны: {", ".join(CONTENT_TYPES)}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        compress = request.query_params.get('gzip') in ('1', 'true')
+        filename = f'{resource}.{file_format}'
+        if compress:
+            filename += '.gz'
+        response = StreamingHttpResponse(
+            export_stream(resource, file_format, compress),
+            content_type=(
+                'application/gzip' if compress
+                else CONTENT_TYPES[file_format]
+            )
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{filename}"'
+        )
+        return response
+
+
+class UserViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     """Отображение действий с пользователями"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
     pagination_class = PageNumberPagination
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (RankedSearchFilter,)
     lookup_field = 'username'
     search_fields = ('username',)
     http_method_names = ('get', 'post', 'patch', 'delete')
@@ -89,7 +181,8 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get', 'patch'],
             permission_classes=[UserPermission])
     def me(self, request):
-        user = request.user
+        # request.user загружен аутентификацией не полностью.
+        user = User.objects.get(pk=request.user.pk)
         if request.method == 'PATCH':
             serializer = MeSerializer(user, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
@@ -99,66 +192,196 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CategoriesViewSet(ListCreateDestroyViewSet):
+class CategoriesViewSet(CachedResponseMixin, BulkUpsertMixin,
+                        ListCreateDestroyViewSet):
     '''Работа с категориями для произведений'''
+    cache_namespace = CATEGORIES
+    upsert_function = staticmethod(partial(upsert_by_slug, Category))
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = PageNumberPagination
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (RankedSearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
 
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class GenreViewSet(CachedResponseMixin, BulkUpsertMixin,
+                   ListCreateDestroyViewSet):
     '''Работа с жанрами для произведений'''
+    cache_namespace = GENRES
+    upsert_function = staticmethod(partial(upsert_by_slug, Genre))
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = PageNumberPagination
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (RankedSearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+def get_ranking_limit(request):
+    try:
+        limit = int(request.query_params.get('limit', 0))
+    except ValueError:
+        limit = 0
+    if limit <= 0:
+        return settings.RANKING_LIMIT
+    return min(limit, settings.RANKING_MAX_LIMIT)
+
+
+class TitleViewSet(CachedResponseMixin, BulkUpsertMixin, StreamingListMixin,
+                   FastReadMixin, SerializerTimingMixin,
+                   viewsets.ModelViewSet):
     """Отображение действий с произведениями"""
+    cache_namespace = TITLES
+    upsert_function = staticmethod(upsert_titles)
+    fast_serializer_class = FastTitleSerializer
     permission_classes = (IsAdminOrReadOnly,)
-    queryset = Title.objects.all().annotate(Avg('reviews__score'))
-    pagination_class = PageNumberPagination
+    queryset = (
+        Title.objects.select_related('category')
+        .prefetch_related('genre')
+        .order_by('id')
+    )
+    pagination_class = TitlePagination
     filterset_class = TitleFilter
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'top', 'trending'):
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    @action(detail=False)
+    def top(self, request):
+        """Произведения с наибольшим рейтингом"""
+        return self.ranking_response(request, top_rankings())
+
+    @action(detail=False)
+    def trending(self, request):
+        """Произведения с наибольшим числом отзывов за последние дни"""
+        return self.ranking_response(request, trending_rankings())
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def ranking_response(self, request, rankings):
+        # Выборка идёт по индексу рейтинговой таблицы и читает только
+        # первые limit строк.
+        genre = request.query_params.get('genre')
+        if genre:
+            rankings = rankings.filter(title__genre__slug=genre)
+        category = request.query_params.get('category')
+        if category:
+            rankings = rankings.filter(title__category__slug=category)
+        rankings = (
+            rankings.select_related('title__category')
+            .prefetch_related('title__genre')[:get_ranking_limit(request)]
+        )
+        serializer = self.get_serializer(
+            [ranking.title for ranking in rankings], many=True
+        )
+        return Response(serializer.data)
+
+
+class ReviewViewSet(ConditionalListMixin, StreamingListMixin, FastReadMixin,
+                    SerializerTimingMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    fast_serializer_class = FastReviewSerializer
+    pagination_class = PubDatePagination
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAuthorAdminModeratorOrReadOnly)
 
+    def get_title(self):
+        # Списковые миксины вызывают get_queryset по нескольку раз за
+        # запрос, а произведение достаточно прочитать один.
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id')
+            )
+        return self._title
+
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return self.get_title().reviews.select_related('author')
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalListMixin, StreamingListMixin,
+                     FastReadMixin, SerializerTimingMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
+    fast_serializer_class = FastCommentSerializer
+    pagination_class = PubDatePagination
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAuthorAdminModeratorOrReadOnly)
 
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review, id=self.kwargs.get('review_id'),
+                title__id=self.kwargs.get('title_id')
+            )
+        return self._review
+
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'),
-                                   title__id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
 
     def get_queryset(self):
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'),
-                                   title__id=self.kwargs.get('title_id'))
-        return review.comments.all()
+        return self.get_review().comments.select_related('author')
+
+class BatchCreate(APIView):
+    """Пакетное создание отзывов или комментариев от имени пользователя"""
+    permission_classes = (IsAuthenticated,)
+    parser_classes = (JSONParser, NDJSONParser)
+    create_items = None
+
+    def post(self, request):
+        if not isinstance(request.data, list):
+            raise ParseError('Ожидался массив объектов.')
+        if len(request.data) > settings.BULK_MAX_BATCH_SIZE:
+            raise ParseError(
+                f'Не больше {settings.BULK_MAX_BATCH_SIZE} элементов.'
+            )
+        try:
+            result = self.create_items(request.user, request.data)
+        except IntegrityError:
+            return Response(
+                {'detail': 'Конфликт с параллельной записью, '
+                           'повторите запрос.'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(result.data, status=status.HTTP_200_OK)
+
+
+class ReviewBatch(BatchCreate):
+    create_items = staticmethod(create_reviews)
+
+
+class CommentBatch(BatchCreate):
+    create_items = staticmethod(create_comments)
+
+
+class ReviewPurge(APIView):
+    """Пакетное удаление отзывов модератором вместе с комментариями"""
+    permission_classes = (IsAdminOrModerator,)
+
+    def post(self, request):
+        serializer = ModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        reviews, comments = purge_reviews(
+            moderation_filter(Review.objects.all(),
+                              **serializer.validated_data)
+        )
+        return Response({'reviews': reviews, 'comments': comments})
+
+
+class CommentPurge(APIView):
+    """Пакетное удаление комментариев модератором"""
+    permission_classes = (IsAdminOrModerator,)
+
+    def post(self, request):
+        serializer = ModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        comments = purge_comments(
+            moderation_filter(Comment.objects.all(),
+                              **serializer.validated_data)
+        )
+        return Response({'comments': comments})
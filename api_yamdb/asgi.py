@@ -0,0 +1,11 @@
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+django.setup(set_prefix=False)
+
+from api.asynchronous import AsyncViewsHandler  # noqa: E402
+
+application = AsyncViewsHandler()
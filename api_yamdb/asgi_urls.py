@@ -0,0 +1,4 @@
+from api.asynchronous import asynchronous
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = asynchronous(sync_urlpatterns)
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Кэши, которые не видны другим процессам.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_process_local(alias):
+    return settings.CACHES[alias]['BACKEND'] in PROCESS_LOCAL_CACHES
+
+
+@register(Tags.database, Tags.caches)
+def check_replica_pin_cache(app_configs, **kwargs):
+    """Отметки чтения из основной базы должны видеть все воркеры.
+
+    Иначе запись, закреплённая в одном воркере gunicorn, не видна
+    остальным, а клиенты с JWT не присылают cookie db_primary.
+    """
+    if not settings.REPLICA_DATABASES:
+        return []
+    alias = settings.REPLICA_PIN_CACHE_ALIAS
+    if alias not in settings.CACHES:
+        return [Error(
+            'REPLICA_PIN_CACHE_ALIAS ссылается на несуществующий кэш '
+            f'"{alias}".',
+            id='api_yamdb.E001',
+        )]
+    if is_process_local(alias):
+        return [Error(
+            'Для реплик нужен общий для воркеров кэш отметок, а кэш '
+            f'"{alias}" хранится в памяти процесса.',
+            hint='Укажите в REPLICA_PIN_CACHE_ALIAS кэш с общим '
+                 'хранилищем, например файловый или Redis.',
+            id='api_yamdb.E002',
+        )]
+    return []
+
+
+@register(Tags.caches)
+def check_response_cache(app_configs, **kwargs):
+    """Кэш ответов API должен быть общим, если процессов несколько.
+
+    Поколения данных сдвигаются в кэше того процесса, который записал
+    изменения; остальные воркеры с кэшем в памяти отдают старые ответы
+    и ETag до истечения API_CACHE_TIMEOUT.
+    """
+    if settings.API_WORKERS <= 1 or not is_process_local(
+            settings.API_CACHE_ALIAS):
+        return []
+    return [Error(
+        f'API обслуживают {settings.API_WORKERS} процессов, а кэш ответов '
+        f'"{settings.API_CACHE_ALIAS}" хранится в памяти процесса.',
+        hint='Задайте API_CACHE_BACKEND=file или другой общий кэш.',
+        id='api_yamdb.E003',
+    )]
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.db import connections
+
+
+def check_connections(**kwargs):
+    """Проверяет постоянные соединения перед обработкой запроса.
+
+    Соединение, которое сервер успел закрыть (рестарт, idle-таймаут,
+    балансировщик), закрывается здесь, и Django откроет новое вместо
+    ошибки посреди запроса. Проверка стоит один SELECT 1 на открытое
+    соединение.
+    """
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if (connection.connection is not None
+                and not connection.in_atomic_block
+                and not connection.is_usable()):
+            connection.close()
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.permissions import SAFE_METHODS
+
+from api.metrics import RequestStats, current_stats, record_query, registry
+from .routers import pin_user, replica_reads
+
+slow_log = logging.getLogger('api.slow_requests')
+
+PIN_COOKIE = 'db_primary'
+
+
+class ReplicaRoutingMiddleware:
+    """Разрешает чтение с реплик для безопасных запросов к API.
+
+    После успешной записи клиент получает cookie, а пользователь —
+    отметку в кэше: следующие REPLICA_PIN_SECONDS секунд его запросы
+    читают из основной базы и видят собственные изменения.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Как в MiddlewareMixin: обработчик Django должен видеть
+            # экземпляр корутинной функцией.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+        return self.finish(request, response)
+
+    @staticmethod
+    def start(request):
+        return replica_reads.set(
+            request.method in SAFE_METHODS
+            and request.path.startswith(settings.REPLICA_READ_PATHS)
+            and PIN_COOKIE not in request.COOKIES
+        )
+
+    def finish(self, request, response):
+        if (settings.REPLICA_DATABASES
+                and request.method not in SAFE_METHODS
+                and response.status_code < 400):
+            self.pin(request, response)
+        return response
+
+    @staticmethod
+    def pin(request, response):
+        response.set_cookie(
+            PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+            httponly=True, samesite='Lax'
+        )
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            pin_user(user.pk)
+
+
+def install_query_recorder(sender=None, connection=None, **kwargs):
+    # Обёртка ставится на соединение один раз и сама проверяет, отобран
+    # ли текущий запрос: так учитываются и запросы из потоков пула ASGI.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class InstrumentationMiddleware:
+    """Собирает метрики запроса с меткой маршрута.
+
+    Для доли API_METRICS['SAMPLE_RATE'] запросов замеряются полное время,
+    число и время запросов к базе, время сериализации и размер ответа.
+    Запросы дольше SLOW_REQUEST_MS попадают в журнал api.slow_requests
+    вместе с самыми медленными SQL.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        connection_created.connect(install_query_recorder)
+        for connection in connections.all():
+            install_query_recorder(connection=connection)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        return self.finish(request, response, stats)
+
+    @staticmethod
+    def sampled():
+        rate = settings.API_METRICS['SAMPLE_RATE']
+        return rate >= 1 or random.random() < rate
+
+    def finish(self, request, response, stats):
+        latency = time.perf_counter() - stats.started
+        match = request.resolver_match
+        route = (match.url_name or 'unnamed') if match else 'unmatched'
+        size = None if response.streaming else len(response.content)
+        registry.observe(
+            route, request.method, response.status_code, stats, latency, size
+        )
+        response['Server-Timing'] = (
+            f'db;dur={stats.db_time * 1000:.1f}, '
+            f'serializer;dur={stats.serializer_time * 1000:.1f}, '
+            f'total;dur={latency * 1000:.1f}'
+        )
+        if latency * 1000 >= settings.API_METRICS['SLOW_REQUEST_MS']:
+            self.log_slow(request, route, latency, stats)
+        return response
+
+    @staticmethod
+    def log_slow(request, route, latency, stats):
+        queries = stats.slowest_queries(
+            settings.API_METRICS['SLOW_LOG_QUERIES']
+        )
+        slow_log.warning(
+            '%s %s (%s): %.1f мс, запросов к базе %d (%.1f мс), '
+            'сериализация %.1f мс\n%s',
+            request.method, request.get_full_path(), route, latency * 1000,
+            stats.queries, stats.db_time * 1000,
+            stats.serializer_time * 1000,
+            '\n'.join(f'  {duration * 1000:.1f} мс: {sql}'
+                      for duration, sql in queries)
+        )
@@ -0,0 +1,121 @@
+"""PostgreSQL с пулом соединений внутри процесса.
+
+Django открывает соединение на первый запрос к базе и закрывает его в
+конце HTTP-запроса (или по истечении CONN_MAX_AGE). Этот бэкенд вместо
+закрытия возвращает соединение в psycopg2 ThreadedConnectionPool, так что
+потоки одного воркера переиспользуют уже установленные соединения.
+Размер пула и время ожидания свободного соединения задаются ключом POOL
+в настройках базы.
+"""
+import os
+import threading
+import time
+
+import psycopg2.extras
+from django.db import OperationalError
+from django.db.backends.postgresql import base
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+class PoolTimeout(PoolError):
+    """За отведённое время в пуле не освободилось соединение"""
+
+
+class BlockingConnectionPool(ThreadedConnectionPool):
+    """ThreadedConnectionPool, который ждёт освобождения соединения.
+
+    Исходный пул сразу бросает PoolError, если все MAX_SIZE соединений
+    заняты; этот ждёт до timeout секунд и только потом бросает PoolTimeout.
+    """
+
+    def __init__(self, minconn, maxconn, *args, timeout=5, **kwargs):
+        self.timeout = timeout
+        self.released = threading.Condition()
+        # Счётчик возвратов: возврат между неудачной попыткой и началом
+        # ожидания не должен потеряться.
+        self.returns = 0
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            returns = self.returns
+            try:
+                return super().getconn(key)
+            except PoolError:
+                if self.closed:
+                    raise
+            with self.released:
+                remaining = deadline - time.monotonic()
+                if self.returns == returns:
+                    if remaining <= 0:
+                        raise PoolTimeout(
+                            f'все {self.maxconn} соединений пула заняты '
+                            f'дольше {self.timeout} с'
+                        )
+                    self.released.wait(remaining)
+
+    def putconn(self, conn=None, key=None, close=False):
+        super().putconn(conn, key, close)
+        with self.released:
+            self.returns += 1
+            self.released.notify()
+
+
+def get_pool(alias, settings_dict, conn_params):
+    # Ключ включает pid: пул, созданный до fork, в воркере не используется.
+    key = (alias, os.getpid())
+    with pools_lock:
+        pool = pools.get(key)
+        if pool is None:
+            options = settings_dict.get('POOL', {})
+            pool = pools[key] = BlockingConnectionPool(
+                options.get('MIN_SIZE', 1), options.get('MAX_SIZE', 10),
+                timeout=options.get('TIMEOUT', 5), **conn_params
+            )
+        return pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_pool(self, conn_params=None):
+        if conn_params is None:
+            conn_params = self.get_connection_params()
+        return get_pool(self.alias, self.settings_dict, conn_params)
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool(conn_params)
+        try:
+            connection = pool.getconn()
+            while connection.closed:
+                pool.putconn(connection, close=True)
+                connection = pool.getconn()
+        except PoolError as error:
+            raise OperationalError(
+                f'Нет свободного соединения с базой "{self.alias}": {error}. '
+                f'Увеличьте DB_POOL_MAX_SIZE или DB_POOL_TIMEOUT.'
+            ) from error
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # Пул сам откатывает незавершённую транзакцию; соединение после
+        # ошибки или отвалившееся от сервера в пул не возвращается.
+        discard = self.errors_occurred and not self.is_usable()
+        with self.wrap_database_errors:
+            self.get_pool().putconn(self.connection, close=discard)
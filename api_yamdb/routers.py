@@ -0,0 +1,50 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Включается middleware только на время безопасных запросов к API.
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+def use_primary():
+    """Переводит чтение до конца текущего запроса на основную базу."""
+    replica_reads.set(False)
+
+
+def pin_key(user_id):
+    return f'db-pin:{user_id}'
+
+
+def pin_user(user_id):
+    """Закрепляет чтение пользователя за основной базой после записи."""
+    caches[settings.REPLICA_PIN_CACHE_ALIAS].set(
+        pin_key(user_id), True, timeout=settings.REPLICA_PIN_SECONDS
+    )
+
+
+def is_pinned(user_id):
+    return bool(caches[settings.REPLICA_PIN_CACHE_ALIAS].get(pin_key(user_id)))
+
+
+class ReplicaRouter:
+    """Отправляет чтение безопасных запросов API на реплики.
+
+    Всё остальное — запись, чтение внутри транзакции, команды и админка —
+    идёт в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.REPLICA_DATABASES
+        if (not replicas or not replica_reads.get()
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
@@ -33,6 +33,7 @@ INSTALLED_APPS = [
 IMPORT_EXPORT_USE_TRANSACTIONS = True
 
 MIDDLEWARE = [
+    'api_yamdb.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -40,6 +41,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api_yamdb.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -62,6 +64,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
+ASGI_APPLICATION = 'api_yamdb.asgi.application'
+ASGI_URLCONF = 'api_yamdb.asgi_urls'
+# Потоки, в которых под ASGI выполняются представления чтения каталога.
+ASYNC_VIEW_THREADS = int(os.getenv('ASYNC_VIEW_THREADS', 8))
 
 
 # Database
@@ -73,10 +79,81 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        # Соединение живёт между запросами воркера; 0 — закрывать каждый раз.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
     }
 }
 
+# Пул соединений внутри процесса вместо постоянного соединения на поток.
+if os.getenv('DB_POOL', '').lower() in ('1', 'true', 'yes'):
+    DATABASES['default'].update(
+        ENGINE='api_yamdb.postgresql_pool',
+        CONN_MAX_AGE=0,
+        POOL={
+            'MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            # Сколько секунд ждать свободного соединения.
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 5)),
+        },
+    )
+
+DB_CONN_HEALTH_CHECKS = os.getenv(
+    'DB_CONN_HEALTH_CHECKS', 'true'
+).lower() in ('1', 'true', 'yes')
+
+# Реплики для чтения: DB_REPLICA_HOSTS=host1,host2:5433
+for number, address in enumerate(
+    filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1
+):
+    host, _, port = address.strip().partition(':')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+REPLICA_READ_PATHS = ('/api/',)
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+# Кэш отметок «читать из основной базы»; при репликах он должен быть общим
+# для воркеров, иначе manage.py check сообщит об ошибке.
+REPLICA_PIN_CACHE_ALIAS = os.getenv('REPLICA_PIN_CACHE_ALIAS', 'default')
+
+DATABASE_ROUTERS = ['api_yamdb.routers.ReplicaRouter']
+
+
+# Cache
+
+API_CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': API_CACHE_BACKENDS['locmem'],
+    },
+    'api': {
+        'BACKEND': API_CACHE_BACKENDS[
+            os.getenv('API_CACHE_BACKEND', 'locmem')
+        ],
+        'LOCATION': os.getenv(
+            'API_CACHE_LOCATION', os.path.join(BASE_DIR, 'cache', 'api')
+        ),
+        'TIMEOUT': int(os.getenv('API_CACHE_TIMEOUT', 300)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('API_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+}
+
+API_CACHE_ALIAS = 'api'
+# Сколько процессов обслуживают API (gunicorn.conf.py выставляет число
+# воркеров); при нескольких кэш ответов должен быть общим.
+API_WORKERS = int(os.getenv('API_WORKERS', 1))
+
 
 # Password validation
 
@@ -123,16 +200,84 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 5,
 }
 
+# Списки произведений, отзывов и комментариев сериализуются из values()
+# без полей DRF; ответ тот же.
+FAST_READ_SERIALIZERS = os.getenv(
+    'FAST_READ_SERIALIZERS', ''
+).lower() in ('1', 'true', 'yes')
+
+# Страницы списков от этого размера отдаются потоком частями по
+# STREAMING_CHUNK_SIZE элементов.
+STREAMING_LIST_THRESHOLD = int(os.getenv('STREAMING_LIST_THRESHOLD', 500))
+STREAMING_CHUNK_SIZE = int(os.getenv('STREAMING_CHUNK_SIZE', 100))
+# Больше элементов на странице списка не отдаётся, какой бы ?limit= ни
+# запросил клиент.
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 1000))
+
+# Тренды считаются по отзывам за последние TRENDING_DAYS дней; топ и
+# тренды отдают по RANKING_LIMIT произведений (не больше RANKING_MAX_LIMIT).
+TRENDING_DAYS = int(os.getenv('TRENDING_DAYS', 7))
+RANKING_LIMIT = int(os.getenv('RANKING_LIMIT', 10))
+RANKING_MAX_LIMIT = int(os.getenv('RANKING_MAX_LIMIT', 100))
+
+BULK_BATCH_SIZE = int(os.getenv('BULK_BATCH_SIZE', 500))
+BULK_MAX_BATCH_SIZE = int(os.getenv('BULK_MAX_BATCH_SIZE', 5000))
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 50000))
+
+AUTH_USER_CACHE = {
+    'TTL': float(os.getenv('AUTH_USER_CACHE_TTL', 30)),
+    'MAX_SIZE': int(os.getenv('AUTH_USER_CACHE_MAX_SIZE', 10000)),
+    'CACHE_ALIAS': os.getenv('AUTH_USER_CACHE_ALIAS') or None,
+}
+
+TOKEN_RATE_LIMIT = {
+    'RATE': float(os.getenv('TOKEN_RATE_LIMIT_RATE', 0.5)),
+    'BURST': int(os.getenv('TOKEN_RATE_LIMIT_BURST', 10)),
+    'MAX_KEYS': int(os.getenv('TOKEN_RATE_LIMIT_MAX_KEYS', 100000)),
+}
+
+API_METRICS = {
+    # Доля запросов, для которых собираются метрики (от 0 до 1).
+    'SAMPLE_RATE': float(os.getenv('API_METRICS_SAMPLE_RATE', 1)),
+    'SLOW_REQUEST_MS': float(os.getenv('API_METRICS_SLOW_REQUEST_MS', 500)),
+    'SLOW_LOG_QUERIES': int(os.getenv('API_METRICS_SLOW_LOG_QUERIES', 10)),
+    # Токен сборщика Prometheus: Authorization: Token <токен>.
+    'TOKEN': os.getenv('API_METRICS_TOKEN', ''),
+    # Адреса, с которых метрики читаются без токена.
+    'ALLOWED_IPS': list(
+        filter(None, os.getenv('API_METRICS_ALLOWED_IPS', '').split(','))
+    ),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.slow_requests': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -0,0 +1,58 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from custom_user.outbox import (BACKOFF_SECONDS, BATCH_SIZE, MAX_ATTEMPTS,
+                                claim_batch, send_batch)
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди EmailOutbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Число потоков отправки')
+        parser.add_argument('--max-attempts', type=int,
+                            default=MAX_ATTEMPTS)
+        parser.add_argument('--backoff', type=int, default=BACKOFF_SECONDS,
+                            help='Задержка перед первой повторной '
+                                 'попыткой, секунды')
+        parser.add_argument('--loop', action='store_true',
+                            help='Работать постоянно, опрашивая очередь')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Пауза между опросами пустой очереди')
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                batches = []
+                for _ in range(options['workers']):
+                    batch = claim_batch(options['batch_size'])
+                    if not batch:
+                        break
+                    batches.append(batch)
+                sent = sum(pool.map(
+                    lambda batch: self.send(batch, options), batches
+                ))
+                claimed = sum(len(batch) for batch in batches)
+                if claimed:
+                    self.stdout.write(
+                        f'Отправлено {sent} из {claimed} писем'
+                    )
+                if not options['loop']:
+                    if not claimed:
+                        return
+                elif not claimed:
+                    time.sleep(options['interval'])
+
+    def send(self, batch, options):
+        try:
+            return send_batch(
+                batch, max_attempts=options['max_attempts'],
+                backoff=options['backoff']
+            )
+        finally:
+            connection.close()
@@ -3,6 +3,7 @@ import uuid
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -51,6 +52,10 @@ class User(AbstractUser):
         blank=True,
         max_length=128
     )
+    updated_at = models.DateTimeField(
+        verbose_name='updated at',
+        auto_now=True
+    )
 
     @property
     def is_user(self):
@@ -75,3 +80,44 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class EmailOutbox(models.Model):
+    """Письмо, ожидающее отправки фоновым обработчиком send_outbox"""
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, 'pending'),
+        (SENDING, 'sending'),
+        (SENT, 'sent'),
+        (FAILED, 'failed'),
+    ]
+    to_email = models.EmailField(max_length=254)
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField()
+    status = models.CharField(
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('id',)
+        indexes = [
+            models.Index(
+                fields=('status', 'next_attempt_at'),
+                name='outbox_status_next_attempt_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.to_email} ({self.status})'
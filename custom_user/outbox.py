@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 30
+LEASE_SECONDS = 600
+
+
+def enqueue_email(to_email, body, subject=''):
+    """Ставит письмо в очередь; вызывается внутри транзакции запроса."""
+    return EmailOutbox.objects.create(
+        to_email=to_email, subject=subject, body=body
+    )
+
+
+def claim_batch(size=BATCH_SIZE):
+    """Забирает пачку писем, готовых к отправке.
+
+    Письма переводятся в статус sending и арендуются на LEASE_SECONDS:
+    если обработчик упадёт, по истечении аренды их заберёт следующий.
+    На PostgreSQL параллельные обработчики не блокируют друг друга
+    благодаря SKIP LOCKED.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(
+                status__in=(EmailOutbox.PENDING, EmailOutbox.SENDING),
+                next_attempt_at__lte=now
+            )
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:size]
+        )
+        EmailOutbox.objects.filter(id__in=ids).update(
+            status=EmailOutbox.SENDING,
+            next_attempt_at=now + timedelta(seconds=LEASE_SECONDS)
+        )
+    return list(EmailOutbox.objects.filter(id__in=ids))
+
+
+def mark_failed(message, error, max_attempts, backoff):
+    message.attempts += 1
+    message.last_error = str(error)
+    if message.attempts >= max_attempts:
+        message.status = EmailOutbox.FAILED
+        return
+    message.status = EmailOutbox.PENDING
+    message.next_attempt_at = timezone.now() + timedelta(
+        seconds=backoff * 2 ** (message.attempts - 1)
+    )
+
+
+def send_batch(messages, max_attempts=MAX_ATTEMPTS,
+               backoff=BACKOFF_SECONDS):
+    """Отправляет пачку писем через одно соединение с почтовым сервером.
+
+    Неотправленные письма возвращаются в очередь с экспоненциальной
+    задержкой, после max_attempts попыток помечаются как failed.
+    Возвращает число отправленных писем.
+    """
+    sent = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for message in messages:
+            mark_failed(message, error, max_attempts, backoff)
+    else:
+        for message in messages:
+            try:
+                EmailMessage(
+                    subject=message.subject, body=message.body,
+                    to=[message.to_email], connection=connection
+                ).send()
+            except Exception as error:
+                mark_failed(message, error, max_attempts, backoff)
+            else:
+                message.attempts += 1
+                message.status = EmailOutbox.SENT
+                message.sent_at = timezone.now()
+                sent += 1
+        connection.close()
+    EmailOutbox.objects.bulk_update(
+        messages,
+        ('status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at')
+    )
+    return sent
@@ -0,0 +1,23 @@
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0:8000')
+workers = int(os.getenv(
+    'GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1
+))
+# Воркеры наследуют окружение мастера: при нескольких процессах кэш ответов
+# API по умолчанию файловый, общий для всех, а проверка api_yamdb.E003 знает
+# их число.
+os.environ.setdefault('API_WORKERS', str(workers))
+if workers > 1:
+    os.environ.setdefault('API_CACHE_BACKEND', 'file')
+# Потоки делят соединения воркера с базой (или его пул при DB_POOL=1),
+# поэтому DB_POOL_MAX_SIZE должен быть не меньше GUNICORN_THREADS.
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+# Перезапуск воркеров ограничивает рост памяти; разброс не даёт всем
+# воркерам перезапуститься одновременно.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
@@ -48,7 +48,7 @@ class CategoryAdmin(ImportExportModelAdmin):
 @admin.register(Title)
 class TitleAdmin(ImportExportModelAdmin):
     resource_classes = [TitleResource]
-    list_display = ('name', 'year', 'category',)
+    list_display = ('name', 'year', 'category', 'rating')
 
 
 class UserAdmin(ImportExportModelAdmin):
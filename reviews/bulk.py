@@ -0,0 +1,37 @@
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.db import connections
+from django.db.models import Max
+
+
+def next_id(model, using='default'):
+    """Первый свободный первичный ключ модели."""
+    last_id = model.objects.using(using).aggregate(last=Max('pk'))['last']
+    return (last_id or 0) + 1
+
+
+def reset_sequences(*models, using='default'):
+    """Сдвигает последовательности после вставки с явными ключами."""
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+@contextmanager
+def explicit_dates(model, *field_names):
+    """Позволяет bulk_create сохранить переданные даты.
+
+    Поля с auto_now_add иначе перезаписываются текущим временем.
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    saved = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in zip(fields, saved):
+            field.auto_now_add = value
@@ -0,0 +1,118 @@
+import csv
+import json
+import zlib
+
+from custom_user.models import User
+from .models import Category, Comment, Genre, Review, Title
+
+CHUNK_SIZE = 2000
+BUFFER_SIZE = 64 * 1024
+
+# Колонки совпадают с форматом, который читает load_catalog.
+RESOURCES = {
+    'users': (User, (
+        ('id', 'id'), ('username', 'username'), ('email', 'email'),
+        ('role', 'role'), ('bio', 'bio'), ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+    )),
+    'categories': (Category, (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    )),
+    'genres': (Genre, (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    )),
+    'titles': (Title, (
+        ('id', 'id'), ('name', 'name'), ('year', 'year'),
+        ('category', 'category_id'), ('description', 'description'),
+    )),
+    'genre_title': (Title.genre.through, (
+        ('id', 'id'), ('title_id', 'title_id'), ('genre_id', 'genre_id'),
+    )),
+    'reviews': (Review, (
+        ('id', 'id'), ('title_id', 'title_id'), ('text', 'text'),
+        ('author', 'author_id'), ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    )),
+    'comments': (Comment, (
+        ('id', 'id'), ('review_id', 'review_id'), ('text', 'text'),
+        ('author', 'author_id'), ('pub_date', 'pub_date'),
+    )),
+}
+
+
+def export_rows(resource, chunk_size=CHUNK_SIZE):
+    """Возвращает имена колонок и ленивый итератор строк ресурса.
+
+    Строки читаются через iterator(), на PostgreSQL — серверным
+    курсором, поэтому в памяти держится не больше chunk_size строк.
+    """
+    model, columns = RESOURCES[resource]
+    rows = model.objects.order_by('id').values_list(
+        *(field for _, field in columns)
+    ).iterator(chunk_size=chunk_size)
+    return [name for name, _ in columns], rows
+
+
+def to_text(value):
+    """Даты выгружаются в ISO 8601 с микросекундами, без потерь."""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(columns, rows):
+    for row in rows:
+        yield json.dumps(
+            dict(zip(columns, row)), ensure_ascii=False, default=to_text
+        ) + '\n'
+
+
+def csv_lines(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(
+            to_text(value) if hasattr(value, 'isoformat') else value
+            for value in row
+        )
+
+
+def encode(lines, compress=False, buffer_size=BUFFER_SIZE):
+    """Склеивает строки в блоки байтов, при compress — в поток gzip."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= buffer_size:
+            data = ''.join(buffer).encode()
+            yield compressor.compress(data) if compress else data
+            buffer = []
+            size = 0
+    data = ''.join(buffer).encode()
+    if compress:
+        yield compressor.compress(data) + compressor.flush()
+    elif data:
+        yield data
+
+
+FORMATTERS = {
+    'ndjson': ndjson_lines,
+    'csv': csv_lines,
+}
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def export_stream(resource, file_format='ndjson', compress=False,
+                  chunk_size=CHUNK_SIZE):
+    columns, rows = export_rows(resource, chunk_size)
+    return encode(FORMATTERS[file_format](columns, rows), compress)
@@ -0,0 +1,326 @@
+import csv
+import gzip
+import io
+import json
+import os
+import time
+
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from custom_user.models import User
+from .bulk import explicit_dates, reset_sequences
+from .models import Category, Comment, Genre, Review, Title
+
+BATCH_SIZE = 5000
+PROGRESS_EVERY = 100000
+
+# Ресурсы в порядке загрузки и имена файлов, под которыми их ищем
+# (в том числе имена из исходного набора данных проекта).
+FILE_NAMES = {
+    'users': ('users',),
+    'categories': ('categories', 'category'),
+    'genres': ('genres', 'genre'),
+    'titles': ('titles',),
+    'genre_title': ('genre_title',),
+    'reviews': ('reviews', 'review'),
+    'comments': ('comments',),
+}
+EXTENSIONS = ('.csv', '.ndjson', '.csv.gz', '.ndjson.gz')
+
+
+class SkipRow(Exception):
+    """Строка ссылается на отсутствующую запись или не полна"""
+
+
+def find_file(directory, resource):
+    for name in FILE_NAMES[resource]:
+        for extension in EXTENSIONS:
+            path = os.path.join(directory, name + extension)
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def read_rows(path):
+    """Лениво читает словари строк из CSV или NDJSON, в том числе .gz."""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as file:
+        if '.ndjson' in path:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file)
+
+
+class IdMap:
+    """Сопоставляет ключи из файла (id или естественный ключ) с pk в базе.
+
+    Заполняется существующими записями и всеми загруженными строками,
+    поэтому ссылки проверяются без обращений к базе.
+    """
+
+    def __init__(self, model, natural_key=None):
+        self.keys = {}
+        self.natural_key = natural_key
+        fields = ('pk', natural_key) if natural_key else ('pk',)
+        for row in model.objects.values_list(*fields).iterator():
+            self.add(*row)
+
+    def add(self, pk, natural=None):
+        self.keys[str(pk)] = pk
+        if natural is not None:
+            self.keys[natural] = pk
+
+    def resolve(self, value, required=True):
+        if value in (None, ''):
+            if required:
+                raise SkipRow
+            return None
+        try:
+            return self.keys[str(value)]
+        except KeyError:
+            raise SkipRow
+
+
+class Writer:
+    """Копит объекты и вставляет их пачками через bulk_create."""
+
+    def __init__(self, model, batch_size, using='default'):
+        self.model = model
+        self.batch_size = batch_size
+        self.using = using
+        self.batch = []
+
+    def add(self, obj):
+        self.batch.append(obj)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        with transaction.atomic(using=self.using):
+            self.insert(self.batch)
+        self.batch = []
+
+    def insert(self, objects):
+        # Повторный запуск пропускает уже загруженные строки.
+        self.model.objects.using(self.using).bulk_create(
+            objects, ignore_conflicts=True
+        )
+
+
+class CopyWriter(Writer):
+    """Вставляет пачки командой COPY FROM STDIN (только PostgreSQL).
+
+    В отличие от bulk_create не пропускает конфликты: загружать так
+    можно только в пустые таблицы.
+    """
+
+    def insert(self, objects):
+        connection = connections[self.using]
+        fields, buffer = self.payload(objects, connection)
+        columns = ', '.join(
+            connection.ops.quote_name(field.column) for field in fields
+        )
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {connection.ops.quote_name(self.model._meta.db_table)}'
+                f' ({columns}) FROM STDIN WITH (FORMAT csv)',
+                buffer
+            )
+
+    def payload(self, objects, connection):
+        """Поля и CSV пачки для COPY.
+
+        NULL записывается пустым значением без кавычек, пустая строка —
+        как "": так их различает COPY в формате csv.
+        """
+        # Ключ передаётся, только если он задан (у связей с жанрами его нет).
+        fields = [
+            field for field in self.model._meta.concrete_fields
+            if not field.primary_key
+            or getattr(objects[0], field.attname) is not None
+        ]
+        buffer = io.StringIO()
+        for obj in objects:
+            buffer.write(','.join(
+                self.format_value(
+                    field.get_db_prep_save(
+                        field.pre_save(obj, add=True), connection
+                    )
+                )
+                for field in fields
+            ))
+            buffer.write('\n')
+        buffer.seek(0)
+        return fields, buffer
+
+    @staticmethod
+    def format_value(value):
+        # csv.writer не умеет оставлять без кавычек только None: с
+        # QUOTE_NONNUMERIC он пишет его как "", и COPY вставил бы пустую
+        # строку вместо NULL.
+        if value is None:
+            return ''
+        if isinstance(value, (int, float)):
+            return str(value)
+        return '"' + str(value).replace('"', '""') + '"'
+
+
+def parse_date(value):
+    if not value:
+        return timezone.now()
+    date = parse_datetime(value)
+    if date is None:
+        raise SkipRow
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date, timezone.utc)
+    return date
+
+
+class CatalogLoader:
+    """Загружает каталог, отзывы и комментарии из каталога с файлами.
+
+    Первичные ключи берутся из файлов, поэтому ссылки между файлами
+    сохраняются; строки с несуществующими ссылками пропускаются и
+    попадают в отчёт.
+    """
+
+    def __init__(self, directory, batch_size=BATCH_SIZE, use_copy=False,
+                 stdout=None):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.use_copy = use_copy
+        self.stdout = stdout
+        self.maps = {}
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def writer(self, model):
+        if self.use_copy and connections['default'].vendor == 'postgresql':
+            return CopyWriter(model, self.batch_size)
+        return Writer(model, self.batch_size)
+
+    def get_map(self, resource):
+        if resource not in self.maps:
+            model, natural_key = {
+                'users': (User, 'username'),
+                'categories': (Category, 'slug'),
+                'genres': (Genre, 'slug'),
+                'titles': (Title, None),
+                'reviews': (Review, None),
+            }[resource]
+            self.maps[resource] = IdMap(model, natural_key)
+        return self.maps[resource]
+
+    def build_users(self, row):
+        user = User(
+            id=int(row['id']), username=row['username'],
+            email=row['email'], role=row.get('role') or User.USER,
+            bio=row.get('bio') or '', first_name=row.get('first_name') or '',
+            last_name=row.get('last_name') or ''
+        )
+        self.get_map('users').add(user.id, user.username)
+        return user
+
+    def build_categories(self, row):
+        category = Category(id=int(row['id']), name=row['name'],
+                            slug=row['slug'])
+        self.get_map('categories').add(category.id, category.slug)
+        return category
+
+    def build_genres(self, row):
+        genre = Genre(id=int(row['id']), name=row['name'], slug=row['slug'])
+        self.get_map('genres').add(genre.id, genre.slug)
+        return genre
+
+    def build_titles(self, row):
+        title = Title(
+            id=int(row['id']), name=row['name'], year=int(row['year']),
+            description=row.get('description') or '',
+            category_id=self.get_map('categories').resolve(
+                row.get('category'), required=False
+            )
+        )
+        self.get_map('titles').add(title.id)
+        return title
+
+    def build_genre_title(self, row):
+        return Title.genre.through(
+            title_id=self.get_map('titles').resolve(row['title_id']),
+            genre_id=self.get_map('genres').resolve(row['genre_id'])
+        )
+
+    def build_reviews(self, row):
+        review = Review(
+            id=int(row['id']), text=row['text'], score=int(row['score']),
+            title_id=self.get_map('titles').resolve(row['title_id']),
+            author_id=self.get_map('users').resolve(row['author']),
+            pub_date=parse_date(row.get('pub_date'))
+        )
+        self.get_map('reviews').add(review.id)
+        return review
+
+    def build_comments(self, row):
+        return Comment(
+            id=int(row['id']), text=row['text'],
+            review_id=self.get_map('reviews').resolve(row['review_id']),
+            author_id=self.get_map('users').resolve(row['author']),
+            pub_date=parse_date(row.get('pub_date'))
+        )
+
+    def load(self, resources=None):
+        """Загружает найденные файлы; возвращает загруженные ресурсы."""
+        loaded = []
+        for resource in FILE_NAMES:
+            if resources and resource not in resources:
+                continue
+            path = find_file(self.directory, resource)
+            if path is None:
+                continue
+            self.load_file(resource, path)
+            loaded.append(resource)
+        return loaded
+
+    def load_file(self, resource, path):
+        build = getattr(self, f'build_{resource}')
+        model = {
+            'users': User, 'categories': Category, 'genres': Genre,
+            'titles': Title, 'genre_title': Title.genre.through,
+            'reviews': Review, 'comments': Comment,
+        }[resource]
+        writer = self.writer(model)
+        rows = skipped = 0
+        started = time.perf_counter()
+        with explicit_dates(model, *(
+            field.name for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now_add', False)
+        )):
+            for row in read_rows(path):
+                try:
+                    writer.add(build(row))
+                except (SkipRow, KeyError, ValueError):
+                    skipped += 1
+                    continue
+                rows += 1
+                if rows % PROGRESS_EVERY == 0:
+                    self.progress(resource, rows, started)
+            writer.flush()
+        self.progress(resource, rows, started, skipped=skipped)
+        reset_sequences(model)
+
+    def progress(self, resource, rows, started, skipped=None):
+        elapsed = time.perf_counter() - started
+        message = (
+            f'{resource}: {rows} строк за {elapsed:.1f} с, '
+            f'{rows / elapsed if elapsed else 0:.0f} строк/с'
+        )
+        if skipped is not None:
+            message += f', пропущено {skipped}'
+        self.log(message)
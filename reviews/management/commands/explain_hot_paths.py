@@ -0,0 +1,139 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+
+from reviews.models import Comment, Review, Title
+from reviews.synthetic import seed_dataset
+
+# Составные индексы из миграции 0004_hot_path_indexes.
+HOT_PATH_INDEXES = {
+    Comment._meta.db_table: ('comment_review_pub_date_idx',),
+    Review._meta.db_table: ('review_title_pub_date_idx',
+                            'review_title_score_idx'),
+    Title._meta.db_table: ('title_category_year_idx',),
+    Title.genre.through._meta.db_table: ('title_genre_genre_title_idx',),
+}
+
+
+def existing_indexes():
+    introspection = connection.introspection
+    with connection.cursor() as cursor:
+        return {
+            name
+            for table in HOT_PATH_INDEXES
+            for name, constraint in introspection.get_constraints(
+                cursor, table
+            ).items()
+            if constraint['index']
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает планы и время горячих запросов к отзывам, комментариям '
+        'и произведениям. С --compare измеряет их без составных индексов '
+        '(удаляя их в транзакции, которая затем откатывается) и с ними. '
+        'На время замера без индексов таблицы заблокированы, поэтому '
+        'запускайте сравнение только на тестовой базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true',
+                            help='Сначала заполнить базу синтетикой')
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--titles', type=int, default=5000)
+        parser.add_argument('--reviews', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=200000)
+        parser.add_argument('--repeat', type=int, default=50,
+                            help='Сколько раз выполнить каждый запрос')
+        parser.add_argument('--compare', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            seed_dataset(
+                users=options['users'], titles=options['titles'],
+                reviews=options['reviews'], comments=options['comments'],
+                stdout=self.stdout
+            )
+        queries = self.hot_queries()
+        if not queries:
+            self.stderr.write('Нет данных: запустите команду с --seed')
+            return
+        if not options['compare']:
+            self.report(queries, options['repeat'])
+            return
+        missing = {
+            name for names in HOT_PATH_INDEXES.values() for name in names
+        } - existing_indexes()
+        if missing:
+            raise CommandError(
+                f'Нет индексов: {", ".join(sorted(missing))}.'
+            )
+        with transaction.atomic():
+            self.drop_indexes()
+            self.stdout.write(self.style.MIGRATE_HEADING('Без индексов'))
+            before = self.report(queries, options['repeat'])
+            # Индексы возвращаются откатом, схема миграций не трогается.
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.MIGRATE_HEADING('С индексами'))
+        after = self.report(queries, options['repeat'])
+        self.stdout.write(self.style.MIGRATE_HEADING('Итог'))
+        for name in queries:
+            self.stdout.write(
+                f'{name}: {before[name]:.3f} мс -> {after[name]:.3f} мс'
+            )
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for names in HOT_PATH_INDEXES.values():
+                for name in names:
+                    cursor.execute(
+                        f'DROP INDEX {connection.ops.quote_name(name)}'
+                    )
+
+    def hot_queries(self):
+        review = (
+            Review.objects.order_by()
+            .values('id', 'title_id', 'author_id')
+            .annotate(comment_count=Count('comments'))
+            .order_by('-comment_count').first()
+        )
+        title = (
+            Title.objects.filter(category__isnull=False, genre__isnull=False)
+            .select_related('category').order_by('-reviews_count').first()
+        )
+        if review is None or title is None:
+            return {}
+        return {
+            'reviews by title': Review.objects.filter(
+                title_id=title.id
+            ).order_by('pub_date', 'id')[:5],
+            'comments by review': Comment.objects.filter(
+                review_id=review['id']
+            ).order_by('pub_date', 'id')[:5],
+            'titles by genre, category and year': Title.objects.filter(
+                genre__slug=title.genre.all()[0].slug,
+                category__slug=title.category.slug,
+                year=title.year
+            ).order_by('id')[:5],
+            'review uniqueness check': Review.objects.filter(
+                author_id=review['author_id'], title__id=review['title_id']
+            )[:1],
+        }
+
+    def report(self, queries, repeat):
+        medians = {}
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.SQL_TABLE(name))
+            self.stdout.write(queryset.explain())
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            medians[name] = statistics.median(timings)
+            self.stdout.write(f'медиана: {medians[name]:.3f} мс\n')
+        return medians
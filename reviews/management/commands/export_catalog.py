@@ -0,0 +1,52 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.export import (CHUNK_SIZE, FORMATTERS, RESOURCES, encode,
+                            export_rows)
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает каталог, отзывы и комментарии в файлы'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resources', nargs='*',
+                            help='Что выгрузить: '
+                                 f'{", ".join(RESOURCES)} (по умолчанию всё)')
+        parser.add_argument('--format', dest='file_format',
+                            choices=list(FORMATTERS), default='ndjson')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--output-dir', default='.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        unknown = set(options['resources']) - RESOURCES.keys()
+        if unknown:
+            raise CommandError(
+                f'Неизвестные ресурсы: {", ".join(sorted(unknown))}'
+            )
+        os.makedirs(options['output_dir'], exist_ok=True)
+        for resource in options['resources'] or RESOURCES:
+            filename = f'{resource}.{options["file_format"]}'
+            if options['gzip']:
+                filename += '.gz'
+            path = os.path.join(options['output_dir'], filename)
+            columns, rows = export_rows(resource, options['chunk_size'])
+            counter = {'rows': 0}
+
+            def counted(rows=rows, counter=counter):
+                for row in rows:
+                    counter['rows'] += 1
+                    yield row
+
+            started = time.perf_counter()
+            lines = FORMATTERS[options['file_format']](columns, counted())
+            with open(path, 'wb') as file:
+                for block in encode(lines, options['gzip']):
+                    file.write(block)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{path}: {counter["rows"]} строк за {elapsed:.2f} с, '
+                f'{counter["rows"] / elapsed if elapsed else 0:.0f} строк/с'
+            )
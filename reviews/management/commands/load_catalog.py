@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.loader import BATCH_SIZE, FILE_NAMES, CatalogLoader
+from reviews.ratings import rebuild_ratings
+from reviews.signals import catalog_loaded
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает пользователей, категории, жанры, произведения, '
+        'связи с жанрами, отзывы и комментарии из CSV/NDJSON (можно .gz). '
+        'Файлы ищутся в каталоге по именам ресурсов, например titles.csv '
+        'или reviews.ndjson.gz.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument('--only', nargs='+', default=None,
+                            help=f'Ресурсы: {", ".join(FILE_NAMES)}')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--copy', action='store_true',
+                            help='Вставлять через COPY (PostgreSQL, только '
+                                 'в пустые таблицы)')
+        parser.add_argument('--skip-ratings', action='store_true',
+                            help='Не пересчитывать рейтинги в конце')
+
+    def handle(self, *args, **options):
+        unknown = set(options['only'] or ()) - FILE_NAMES.keys()
+        if unknown:
+            raise CommandError(
+                f'Неизвестные ресурсы: {", ".join(sorted(unknown))}'
+            )
+        loader = CatalogLoader(
+            options['directory'], batch_size=options['batch_size'],
+            use_copy=options['copy'], stdout=self.stdout
+        )
+        loaded = loader.load(options['only'])
+        if not loaded:
+            raise CommandError('В каталоге не найдено файлов для загрузки')
+        if 'reviews' in loaded and not options['skip_ratings']:
+            updated = rebuild_ratings()
+            self.stdout.write(f'Пересчитан рейтинг {updated} произведений')
+        # Загрузка идёт мимо сигналов моделей: подписчики (кэш ответов API)
+        # узнают о ней отдельным сигналом.
+        catalog_loaded.send(sender=self.__class__, resources=loaded)
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reviews.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг и счётчики отзывов всех произведений'
+
+    def handle(self, *args, **options):
+        updated = rebuild_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {updated}')
+        )
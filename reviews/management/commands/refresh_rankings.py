@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import Title
+from reviews.rankings import refresh_rankings
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинговую таблицу для топа и трендов. Запускается '
+        'периодически, чтобы старые отзывы выпадали из трендов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--trending', action='store_true',
+            help='Только произведения, которые сейчас есть в трендах'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Title.objects.all()
+        if options['trending']:
+            queryset = queryset.filter(ranking__recent_reviews__gt=0)
+        updated = refresh_rankings(queryset)
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {updated}')
+        )
@@ -0,0 +1,80 @@
+# Generated by Django 3.2.14 on 2026-10-18 20:32
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def fill_rankings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    TitleRanking = apps.get_model('reviews', 'TitleRanking')
+    now = timezone.now()
+    recent = (
+        Review.objects.filter(
+            title=OuterRef('pk'),
+            pub_date__gte=now - timedelta(days=settings.TRENDING_DAYS)
+        )
+        .order_by()
+        .values('title')
+    )
+    titles = Title.objects.annotate(
+        recent_reviews=Coalesce(
+            Subquery(recent.annotate(count=Count('id')).values('count')), 0
+        ),
+        recent_score_sum=Coalesce(
+            Subquery(recent.annotate(total=Sum('score')).values('total')), 0
+        ),
+    ).values_list('id', 'rating', 'reviews_count', 'recent_reviews',
+                  'recent_score_sum')
+    TitleRanking.objects.bulk_create(
+        [
+            TitleRanking(
+                title_id=title_id, rating=rating, reviews_count=count,
+                recent_reviews=recent_count, recent_score_sum=recent_sum,
+                refreshed_at=now
+            )
+            for title_id, rating, count, recent_count, recent_sum
+            in titles.iterator()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='reviews.title', verbose_name='Произведение')),
+                ('rating', models.FloatField(blank=True, null=True, verbose_name='Рейтинг')),
+                ('reviews_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('recent_reviews', models.PositiveIntegerField(default=0, verbose_name='Отзывов за период')),
+                ('recent_score_sum', models.PositiveBigIntegerField(default=0, verbose_name='Сумма оценок за период')),
+                ('refreshed_at', models.DateTimeField(null=True, verbose_name='Пересчитано')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг произведения',
+                'verbose_name_plural': 'Рейтинги произведений',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['-rating', '-reviews_count', 'title'], name='ranking_top_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['-recent_reviews', '-recent_score_sum', 'title'], name='ranking_trending_idx'),
+        ),
+        migrations.RunPython(fill_rankings, migrations.RunPython.noop),
+    ]
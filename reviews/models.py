@@ -50,15 +50,84 @@ class Title(models.Model):
         verbose_name='Категория',
         related_name='titles'
     )
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    reviews_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+        editable=False
+    )
+    score_sum = models.PositiveBigIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(
+                fields=('category', 'year'),
+                name='title_category_year_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class TitleRanking(models.Model):
+    """Материализованный рейтинг произведения для топа и трендов.
+
+    Строки обновляются при каждой записи отзыва и командой
+    refresh_rankings; счётчики за последние TRENDING_DAYS дней
+    устаревают, пока их не пересчитает команда.
+    """
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name='Произведение',
+        related_name='ranking'
+    )
+    rating = models.FloatField('Рейтинг', null=True, blank=True)
+    reviews_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0
+    )
+    recent_reviews = models.PositiveIntegerField(
+        'Отзывов за период',
+        default=0
+    )
+    recent_score_sum = models.PositiveBigIntegerField(
+        'Сумма оценок за период',
+        default=0
+    )
+    refreshed_at = models.DateTimeField('Пересчитано', null=True)
+
+    class Meta:
+        verbose_name = 'Рейтинг произведения'
+        verbose_name_plural = 'Рейтинги произведений'
+        indexes = [
+            models.Index(
+                fields=('-rating', '-reviews_count', 'title'),
+                name='ranking_top_idx'
+            ),
+            models.Index(
+                fields=('-recent_reviews', '-recent_score_sum', 'title'),
+                name='ranking_trending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return str(self.title_id)
+
+
 class Review(models.Model):
     title = models.ForeignKey(
         Title,
@@ -87,6 +156,10 @@ class Review(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         verbose_name = 'Отзыв'
@@ -98,6 +171,24 @@ class Review(models.Model):
                 name='unique_review'
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+            models.Index(
+                fields=('title', 'score'),
+                name='review_title_score_idx'
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Оценка на момент загрузки нужна, чтобы при правке отзыва
+        # сдвинуть сумму оценок произведения на разницу.
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
 
 
 class Comment(models.Model):
@@ -121,8 +212,18 @@ class Comment(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('pub_date',)
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+        ]
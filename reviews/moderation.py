@@ -0,0 +1,86 @@
+from django.db import connections, transaction
+
+from .models import Comment, Review, Title
+from .ratings import rebuild_ratings
+from .signals import reviews_purged
+
+DELETE_CHUNK_SIZE = 500
+
+
+def moderation_filter(queryset, ids=None, author=None, since=None,
+                      until=None):
+    """Сужает queryset отзывов или комментариев по условиям модерации."""
+    if ids:
+        queryset = queryset.filter(id__in=ids)
+    if author is not None:
+        queryset = queryset.filter(author=author)
+    if since is not None:
+        queryset = queryset.filter(pub_date__gte=since)
+    if until is not None:
+        queryset = queryset.filter(pub_date__lte=until)
+    return queryset.order_by()
+
+
+def delete_rows(model, ids, using):
+    """Удаляет строки по первичному ключу запросами DELETE … WHERE IN.
+
+    Каскады и сигналы Django не выполняются: зависимые строки удаляет
+    вызывающий код. Возвращает число удалённых строк.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    deleted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+            chunk = ids[start:start + DELETE_CHUNK_SIZE]
+            cursor.execute(
+                f'DELETE FROM {quote(model._meta.db_table)} '
+                f'WHERE {quote(model._meta.pk.column)} IN '
+                f'({", ".join(["%s"] * len(chunk))})',
+                chunk
+            )
+            deleted += cursor.rowcount
+    return deleted
+
+
+def purge_reviews(queryset):
+    """Удаляет отзывы и их комментарии без загрузки объектов в Python.
+
+    Сначала выбираются id отзывов и их произведений, затем комментарии
+    и отзывы удаляются пачками DELETE по этим id; счётчики и рейтинговая
+    таблица затронутых произведений пересчитываются в той же транзакции.
+    Построчные сигналы удаления отзывов не отправляются, вместо них
+    отправляется reviews_purged.
+    Возвращает (число отзывов, число комментариев).
+    """
+    using = queryset.db
+    with transaction.atomic(using=using):
+        rows = list(
+            queryset.order_by().select_for_update()
+            .values_list('id', 'title_id')
+        )
+        ids = [review_id for review_id, _ in rows]
+        title_ids = sorted({title_id for _, title_id in rows})
+        comments_deleted = 0
+        for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+            comments_deleted += purge_comments(
+                Comment.objects.using(using).filter(
+                    review_id__in=ids[start:start + DELETE_CHUNK_SIZE]
+                )
+            )
+        reviews_deleted = delete_rows(Review, ids, using)
+        if title_ids:
+            rebuild_ratings(
+                Title.objects.using(using).filter(id__in=title_ids)
+            )
+            reviews_purged.send(sender=Review, title_ids=title_ids)
+    return reviews_deleted, comments_deleted
+
+
+def purge_comments(queryset):
+    """Удаляет комментарии одним DELETE и возвращает их число.
+
+    У комментариев нет зависимых моделей и обработчиков удаления, поэтому
+    delete() выполняется одним запросом без загрузки строк.
+    """
+    return queryset.order_by().delete()[0]
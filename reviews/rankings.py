@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Review, Title, TitleRanking
+
+
+def refresh_rankings(queryset=None):
+    """Пересчитывает строки рейтинговой таблицы для произведений queryset.
+
+    Недостающие строки создаются, затем все обновляются одним UPDATE:
+    рейтинг и число отзывов копируются из произведения, отзывы за
+    последние TRENDING_DAYS дней считаются по индексу (title, pub_date).
+    """
+    if queryset is None:
+        queryset = Title.objects.all()
+    using = queryset.db
+    title_ids = queryset.order_by().values('id')
+    missing = title_ids.filter(ranking__isnull=True).values_list(
+        'id', flat=True
+    )
+    TitleRanking.objects.using(using).bulk_create(
+        [TitleRanking(title_id=title_id) for title_id in missing],
+        batch_size=1000, ignore_conflicts=True
+    )
+    now = timezone.now()
+    title = Title.objects.filter(pk=OuterRef('title'))
+    recent = (
+        Review.objects.filter(
+            title=OuterRef('title'),
+            pub_date__gte=now - timedelta(days=settings.TRENDING_DAYS)
+        )
+        .order_by()
+        .values('title')
+    )
+    return TitleRanking.objects.using(using).filter(
+        title__in=title_ids
+    ).update(
+        rating=Subquery(title.values('rating')),
+        reviews_count=Subquery(title.values('reviews_count')),
+        recent_reviews=Coalesce(
+            Subquery(recent.annotate(count=Count('id')).values('count')), 0
+        ),
+        recent_score_sum=Coalesce(
+            Subquery(recent.annotate(total=Sum('score')).values('total')), 0
+        ),
+        refreshed_at=now,
+    )
+
+
+def shift_ranking(title_id, count_delta, score_delta, pub_date):
+    """Сдвигает строку рейтинговой таблицы вслед за отзывом одним UPDATE.
+
+    Рейтинг и число отзывов копируются из уже обновлённого произведения,
+    счётчики за период сдвигаются на ту же разницу, если отзыв опубликован
+    в последние TRENDING_DAYS дней. Если строки ещё нет, она создаётся
+    пересчётом после коммита и только для существующего произведения:
+    при удалении произведения каскад удаляет отзывы уже после его строки
+    рейтинга, и создание в транзакции вернуло бы её обратно.
+    """
+    title = Title.objects.filter(pk=title_id)
+    changes = {
+        'rating': Subquery(title.values('rating')),
+        'reviews_count': Subquery(title.values('reviews_count')),
+    }
+    since = timezone.now() - timedelta(days=settings.TRENDING_DAYS)
+    if pub_date >= since:
+        changes['recent_reviews'] = Greatest(
+            F('recent_reviews') + count_delta, 0
+        )
+        changes['recent_score_sum'] = Greatest(
+            F('recent_score_sum') + score_delta, 0
+        )
+    if not TitleRanking.objects.filter(title_id=title_id).update(**changes):
+        transaction.on_commit(lambda: refresh_rankings(title))
+
+
+def top_rankings():
+    """Произведения с оценками по убыванию рейтинга."""
+    return TitleRanking.objects.filter(rating__isnull=False).order_by(
+        '-rating', '-reviews_count', 'title'
+    )
+
+
+def trending_rankings():
+    """Произведения по числу отзывов за последние TRENDING_DAYS дней."""
+    return TitleRanking.objects.filter(recent_reviews__gt=0).order_by(
+        '-recent_reviews', '-recent_score_sum', 'title'
+    )
@@ -0,0 +1,66 @@
+from django.db.models import (Avg, Case, Count, ExpressionWrapper, F,
+                              FloatField, OuterRef, Subquery, Sum, Value,
+                              When)
+from django.db.models.functions import Cast, Coalesce
+
+from .models import Review, Title
+from .rankings import refresh_rankings, shift_ranking
+
+
+def apply_review_delta(title_id, count_delta, score_delta, pub_date):
+    """Сдвигает счётчики оценок произведения одним UPDATE.
+
+    Новые значения считаются в базе от текущих, поэтому параллельные
+    отзывы на одно произведение не затирают друг друга. Строка
+    рейтинговой таблицы сдвигается на ту же разницу в той же транзакции
+    (см. shift_ranking); pub_date — дата публикации отзыва.
+    """
+    new_count = F('reviews_count') + count_delta
+    new_sum = F('score_sum') + score_delta
+    updated = Title.objects.filter(pk=title_id).update(
+        reviews_count=new_count,
+        score_sum=new_sum,
+        rating=Case(
+            When(
+                reviews_count__gt=-count_delta,
+                then=ExpressionWrapper(
+                    Cast(new_sum, FloatField())
+                    / Cast(new_count, FloatField()),
+                    output_field=FloatField()
+                )
+            ),
+            default=Value(None),
+            output_field=FloatField()
+        )
+    )
+    if updated:
+        shift_ranking(title_id, count_delta, score_delta, pub_date)
+    return updated
+
+
+def rebuild_ratings(queryset=None):
+    """Пересчитывает рейтинг произведений по таблице отзывов.
+
+    Вместе с ним обновляется рейтинговая таблица тех же произведений.
+    """
+    if queryset is None:
+        queryset = Title.objects.all()
+    stats = (
+        Review.objects.filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+    )
+    updated = queryset.update(
+        reviews_count=Coalesce(
+            Subquery(stats.annotate(count=Count('id')).values('count')), 0
+        ),
+        score_sum=Coalesce(
+            Subquery(stats.annotate(total=Sum('score')).values('total')), 0
+        ),
+        rating=Subquery(
+            stats.annotate(avg=Avg('score')).values('avg'),
+            output_field=FloatField()
+        ),
+    )
+    refresh_rankings(queryset)
+    return updated
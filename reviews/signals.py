@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .models import Review
+from .ratings import apply_review_delta
+
+# Отправляется после загрузки каталога в обход сигналов моделей;
+# resources — список загруженных ресурсов.
+catalog_loaded = Signal()
+# Отправляется после пакетного удаления отзывов без построчных сигналов;
+# title_ids — произведения, у которых удалены отзывы.
+reviews_purged = Signal()
+
+
+@receiver(pre_save, sender=Review)
+def review_pre_save(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    if getattr(instance, '_loaded_score', None) is None:
+        instance._loaded_score = (
+            Review.objects.filter(pk=instance.pk)
+            .values_list('score', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        apply_review_delta(
+            instance.title_id, 1, instance.score, instance.pub_date
+        )
+    elif instance._loaded_score != instance.score:
+        apply_review_delta(
+            instance.title_id, 0, instance.score - instance._loaded_score,
+            instance.pub_date
+        )
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    score = getattr(instance, '_loaded_score', None)
+    if score is None:
+        score = instance.score
+    apply_review_delta(instance.title_id, -1, -score, instance.pub_date)
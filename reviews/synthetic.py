@@ -0,0 +1,121 @@
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from custom_user.models import User
+from .bulk import explicit_dates, next_id, reset_sequences
+from .models import Category, Comment, Genre, Review, Title
+from .ratings import rebuild_ratings
+
+BATCH_SIZE = 2000
+
+
+def skewed_counts(total, buckets, rng, skew=1.2):
+    """Раскладывает total по buckets по закону Ципфа."""
+    weights = [1 / (rank ** skew) for rank in range(1, buckets + 1)]
+    rng.shuffle(weights)
+    scale = total / sum(weights)
+    return [int(weight * scale) for weight in weights]
+
+
+def seed_dataset(users=1000, categories=10, genres=30, titles=5000,
+                 reviews=100000, comments=200000, days=365, seed=0,
+                 stdout=None):
+    """Заполняет базу синтетическими данными с реалистичным перекосом.
+
+    Отзывы и комментарии распределяются по закону Ципфа: у немногих
+    популярных произведений их тысячи, у большинства единицы. Первичные
+    ключи задаются явно, поэтому данные можно добавлять к уже
+    существующим.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    prefix = f's{seed}x{next_id(User)}'
+
+    def log(message):
+        if stdout is not None:
+            stdout.write(message)
+
+    def random_date():
+        return now - timedelta(seconds=rng.randrange(days * 24 * 3600))
+
+    with transaction.atomic():
+        start = next_id(User)
+        user_ids = list(range(start, start + users))
+        User.objects.bulk_create(
+            (User(id=pk, username=f'{prefix}_user{pk}',
+                  email=f'{prefix}_user{pk}@example.com')
+             for pk in user_ids),
+            batch_size=BATCH_SIZE
+        )
+        log(f'users: {users}')
+
+        start = next_id(Category)
+        category_ids = list(range(start, start + categories))
+        Category.objects.bulk_create(
+            Category(id=pk, name=f'Категория {pk}',
+                     slug=f'{prefix}-category-{pk}')
+            for pk in category_ids
+        )
+        start = next_id(Genre)
+        genre_ids = list(range(start, start + genres))
+        Genre.objects.bulk_create(
+            Genre(id=pk, name=f'Жанр {pk}', slug=f'{prefix}-genre-{pk}')
+            for pk in genre_ids
+        )
+        log(f'categories: {categories}, genres: {genres}')
+
+        start = next_id(Title)
+        title_ids = list(range(start, start + titles))
+        Title.objects.bulk_create(
+            (Title(id=pk, name=f'Произведение {pk}',
+                   year=rng.randint(1950, now.year),
+                   description='Синтетическое произведение',
+                   category_id=rng.choice(category_ids))
+             for pk in title_ids),
+            batch_size=BATCH_SIZE
+        )
+        Title.genre.through.objects.bulk_create(
+            (Title.genre.through(title_id=title_id, genre_id=genre_id)
+             for title_id in title_ids
+             for genre_id in rng.sample(genre_ids, rng.randint(1, 3))),
+            batch_size=BATCH_SIZE
+        )
+        log(f'titles: {titles}')
+
+        review_id = next_id(Review)
+        review_rows = []
+        for title_id, count in zip(
+                title_ids, skewed_counts(reviews, titles, rng)):
+            for author_id in rng.sample(user_ids, min(count, users)):
+                review_rows.append(Review(
+                    id=review_id, title_id=title_id, author_id=author_id,
+                    text='Синтетический отзыв', score=rng.randint(1, 10),
+                    pub_date=random_date()
+                ))
+                review_id += 1
+        review_ids = [review.id for review in review_rows]
+        with explicit_dates(Review, 'pub_date'):
+            Review.objects.bulk_create(review_rows, batch_size=BATCH_SIZE)
+        log(f'reviews: {len(review_rows)}')
+
+        comment_id = next_id(Comment)
+        comment_rows = []
+        for review_pk, count in zip(
+                review_ids, skewed_counts(comments, len(review_ids), rng)):
+            for _ in range(count):
+                comment_rows.append(Comment(
+                    id=comment_id, review_id=review_pk,
+                    author_id=rng.choice(user_ids),
+                    text='Синтетический комментарий',
+                    pub_date=random_date()
+                ))
+                comment_id += 1
+        with explicit_dates(Comment, 'pub_date'):
+            Comment.objects.bulk_create(comment_rows, batch_size=BATCH_SIZE)
+        log(f'comments: {len(comment_rows)}')
+
+        reset_sequences(User, Category, Genre, Title, Review, Comment)
+        rebuild_ratings(Title.objects.filter(id__gte=title_ids[0]))
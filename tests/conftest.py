@@ -0,0 +1,54 @@
+import pytest
+from django.core.cache import caches
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import user_cache
+from api.metrics import registry
+from api.throttling import TokenBucketThrottle
+from custom_user.models import User
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    for cache in caches.all():
+        cache.clear()
+    user_cache.clear()
+    TokenBucketThrottle.buckets.clear()
+    registry.reset()
+
+
+def make_client(user=None):
+    client = APIClient()
+    if user is not None:
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+    return client
+
+
+@pytest.fixture
+def admin(db):
+    return User.objects.create(
+        username='admin', email='admin@example.com', role=User.ADMIN
+    )
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create(username='user', email='user@example.com')
+
+
+@pytest.fixture
+def admin_api_client(admin):
+    return make_client(admin)
+
+
+@pytest.fixture
+def user_api_client(user):
+    return make_client(user)
+
+
+@pytest.fixture
+def api_client():
+    return make_client()
@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.testing import ApplicationCommunicator
+
+from api import asynchronous
+from api.asynchronous import AsyncViewsHandler
+from api.cache import get_cache
+from reviews.models import Category, Comment, Genre, Review, Title
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def catalog(user):
+    category = Category.objects.create(name='Фильм', slug='film')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Сталкер', year=1979,
+                                 description='', category=category)
+    title.genre.add(genre)
+    review = Review.objects.create(title=title, author=user, text='Да',
+                                   score=8)
+    Comment.objects.create(review=review, author=user, text='Согласен')
+    return title, review
+
+
+async def asgi_get(path, query=''):
+    """Выполняет GET через AsyncViewsHandler, как это делает сервер ASGI."""
+    communicator = ApplicationCommunicator(AsyncViewsHandler(), {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'query_string': query.encode(), 'headers': [(b'host', b'testserver')],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 0),
+    })
+    await communicator.send_input({'type': 'http.request', 'body': b''})
+    start = await communicator.receive_output(timeout=5)
+    body = b''
+    while True:
+        message = await communicator.receive_output(timeout=5)
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            headers = {
+                name.decode().lower(): value.decode()
+                for name, value in start['headers']
+            }
+            return start['status'], headers, body
+
+
+def test_async_views_match_sync(monkeypatch, api_client, catalog):
+    title, review = catalog
+    pooled = []
+    get_executor = asynchronous.get_executor
+    monkeypatch.setattr(asynchronous, 'get_executor',
+                        lambda: pooled.append(True) or get_executor())
+    cases = [
+        ('/api/v1/titles/', ''),
+        ('/api/v1/titles/', 'genre=drama&year=1979'),
+        (f'/api/v1/titles/{title.id}/', ''),
+        (f'/api/v1/titles/{title.id}/reviews/', ''),
+        (f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/', ''),
+    ]
+    for path, query in cases:
+        expected = api_client.get(f'{path}?{query}')
+        # Кэш ответов сбрасывается, чтобы асинхронный ответ построило
+        # представление, а не взял готовым из кэша.
+        get_cache().clear()
+        status, headers, body = asyncio.run(asgi_get(path, query))
+        assert status == expected.status_code == 200, path
+        assert json.loads(body) == expected.json(), path
+        if expected.has_header('ETag'):
+            assert headers['etag'] == expected['ETag'], path
+    assert len(pooled) == len(cases)
+
+
+def test_async_missing_title_is_404(api_client):
+    status, _, body = asyncio.run(asgi_get('/api/v1/titles/0/reviews/'))
+    assert status == 404
+    assert json.loads(body) == api_client.get(
+        '/api/v1/titles/0/reviews/'
+    ).json()
@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.authentication import user_cache
+from custom_user.models import User
+
+pytestmark = pytest.mark.django_db
+
+USERS_URL = '/api/v1/users/'
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Подменяет монотонные часы, которыми кэш отмеряет TTL."""
+    now = [1000.0]
+    monkeypatch.setattr('api.authentication.time.monotonic',
+                        lambda: now[0])
+    return now
+
+
+def get_users(client):
+    """Статус ответа и число запросов к таблице пользователей."""
+    with CaptureQueriesContext(connection) as context:
+        status_code = client.get(USERS_URL).status_code
+    return status_code, sum(
+        User._meta.db_table in query['sql']
+        for query in context.captured_queries
+    )
+
+
+def test_repeated_request_skips_user_select(user_api_client):
+    assert get_users(user_api_client) == (403, 1)
+    assert get_users(user_api_client) == (403, 0)
+
+
+def test_stale_entry_expires_after_ttl(settings, clock, user,
+                                       user_api_client):
+    settings.AUTH_USER_CACHE = {**settings.AUTH_USER_CACHE, 'TTL': 30}
+    assert get_users(user_api_client)[0] == 403
+    # update() не отправляет сигналов: так выглядит правка из другого
+    # процесса без общего кэша.
+    User.objects.filter(pk=user.pk).update(role=User.ADMIN)
+    clock[0] += 29
+    assert get_users(user_api_client)[0] == 403
+    clock[0] += 2
+    assert get_users(user_api_client)[0] == 200
+
+
+def test_role_change_invalidates_entry(user, user_api_client):
+    assert get_users(user_api_client)[0] == 403
+    user.role = User.ADMIN
+    user.save()
+    assert get_users(user_api_client)[0] == 200
+
+
+def test_deactivation_invalidates_entry(admin, admin_api_client):
+    assert get_users(admin_api_client)[0] == 200
+    admin.is_active = False
+    admin.save()
+    assert get_users(admin_api_client)[0] == 401
+
+
+def test_deleted_user_is_rejected(user, user_api_client):
+    assert get_users(user_api_client)[0] == 403
+    user.delete()
+    assert get_users(user_api_client)[0] == 401
+
+
+def test_shared_cache_is_invalidated(settings, user, user_api_client):
+    settings.AUTH_USER_CACHE = {
+        **settings.AUTH_USER_CACHE, 'CACHE_ALIAS': 'default'
+    }
+    assert get_users(user_api_client) == (403, 1)
+    # Другой процесс: своего кэша нет, запись берётся из общего.
+    user_cache.clear()
+    assert get_users(user_api_client) == (403, 0)
+    user.role = User.ADMIN
+    user.save()
+    user_cache.clear()
+    assert get_users(user_api_client)[0] == 200
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+from django.db import IntegrityError
+
+from api import views
+from api.serializers import DUPLICATE_REVIEW
+from reviews.models import Comment, Review, Title
+
+pytestmark = pytest.mark.django_db
+
+REVIEWS_URL = '/api/v1/reviews/batch/'
+COMMENTS_URL = '/api/v1/comments/batch/'
+
+
+@pytest.fixture
+def titles():
+    return [
+        Title.objects.create(name=f'Произведение {number}', year=2000,
+                             description='')
+        for number in range(3)
+    ]
+
+
+def test_review_batch(user, user_api_client, titles):
+    Review.objects.create(title=titles[2], author=user, text='Было',
+                          score=5)
+    response = user_api_client.post(REVIEWS_URL, [
+        {'title': titles[0].id, 'text': 'Да', 'score': 8},
+        {'title': titles[1].id, 'text': 'Нет', 'score': 4},
+        {'title': titles[0].id, 'text': 'Повтор', 'score': 1},
+        {'title': titles[2].id, 'text': 'Уже есть', 'score': 1},
+        {'title': 0, 'text': 'Нет такого', 'score': 1},
+        {'title': titles[1].id, 'text': 'Оценка', 'score': 11},
+    ], format='json')
+    assert response.status_code == 200
+    data = response.json()
+    assert data['created'] == 2
+    assert [error['index'] for error in data['errors']] == [2, 3, 4, 5]
+    assert data['errors'][0]['errors'] == {'title': [DUPLICATE_REVIEW]}
+    assert data['errors'][1]['errors'] == {'title': [DUPLICATE_REVIEW]}
+    assert set(Review.objects.filter(author=user).values_list(
+        'title_id', 'score'
+    )) == {(titles[0].id, 8), (titles[1].id, 4), (titles[2].id, 5)}
+    titles[0].refresh_from_db()
+    assert (titles[0].reviews_count, titles[0].rating) == (1, 8)
+
+
+def test_comment_batch_from_ndjson(user, user_api_client, titles):
+    review = Review.objects.create(title=titles[0], author=user, text='Да',
+                                   score=8)
+    items = [
+        {'review': review.id, 'text': 'Первый'},
+        {'review': review.id, 'text': 'Первый'},
+        {'review': 0, 'text': 'Нет отзыва'},
+        {'review': review.id, 'text': 'Второй'},
+    ]
+    response = user_api_client.post(
+        COMMENTS_URL, '\n'.join(map(json.dumps, items)).encode(),
+        content_type='application/x-ndjson'
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data['created'] == 2
+    assert [error['index'] for error in data['errors']] == [1, 2]
+    assert list(Comment.objects.order_by('id').values_list(
+        'author', 'text'
+    )) == [(user.id, 'Первый'), (user.id, 'Второй')]
+
+
+def test_batch_size_is_capped(settings, user_api_client, titles):
+    settings.BULK_MAX_BATCH_SIZE = 2
+    response = user_api_client.post(REVIEWS_URL, [
+        {'title': title.id, 'text': 'Да', 'score': 8} for title in titles
+    ], format='json')
+    assert response.status_code == 400
+    assert not Review.objects.exists()
+
+
+def test_batch_requires_authentication(api_client, titles):
+    response = api_client.post(REVIEWS_URL, [
+        {'title': titles[0].id, 'text': 'Да', 'score': 8}
+    ], format='json')
+    assert response.status_code == 401
+
+
+def test_concurrent_duplicate_is_conflict(monkeypatch, user_api_client,
+                                          titles):
+    def racing_create(author, items):
+        raise IntegrityError('unique_review')
+
+    monkeypatch.setattr(views.ReviewBatch, 'create_items',
+                        staticmethod(racing_create))
+    response = user_api_client.post(REVIEWS_URL, [
+        {'title': titles[0].id, 'text': 'Да', 'score': 8}
+    ], format='json')
+    assert response.status_code == 409
+
+
+def test_single_duplicate_review_is_translated(user, user_api_client,
+                                               titles):
+    url = f'/api/v1/titles/{titles[0].id}/reviews/'
+    data = {'text': 'Да', 'score': 8}
+    assert user_api_client.post(url, data, format='json').status_code == 201
+    response = user_api_client.post(url, data, format='json')
+    assert response.status_code == 400
+    assert DUPLICATE_REVIEW in json.dumps(response.json(),
+                                          ensure_ascii=False)
+    assert Review.objects.count() == 1
@@ -0,0 +1,111 @@
+import json
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError
+
+from api import bulk
+from api.mixins import BulkUpsertMixin
+from reviews.models import Category, Genre, Title
+
+pytestmark = pytest.mark.django_db
+
+
+def ndjson(items):
+    return '\n'.join(map(json.dumps, items)).encode()
+
+
+def post_ndjson(client, url, items):
+    return client.post(url, ndjson(items),
+                       content_type='application/x-ndjson')
+
+
+def test_slug_upsert_creates_and_updates(admin_api_client):
+    Category.objects.create(name='Кино', slug='film')
+    response = admin_api_client.post('/api/v1/categories/bulk/', [
+        {'name': 'Фильм', 'slug': 'film'},
+        {'name': 'Книга', 'slug': 'book'},
+        {'name': 'Повтор', 'slug': 'book'},
+        {'name': 'Без слага'},
+    ], format='json')
+    assert response.status_code == 200
+    data = response.json()
+    assert (data['created'], data['updated']) == (1, 1)
+    assert [error['index'] for error in data['errors']] == [2, 3]
+    assert dict(Category.objects.values_list('slug', 'name')) == {
+        'film': 'Фильм', 'book': 'Книга'
+    }
+
+
+def test_title_upsert_from_ndjson(admin_api_client):
+    Category.objects.create(name='Фильм', slug='film')
+    Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Старое', year=1979, description='')
+    response = post_ndjson(admin_api_client, '/api/v1/titles/bulk/', [
+        {'id': title.id, 'name': 'Сталкер', 'year': 1979,
+         'description': '', 'genre': ['drama'], 'category': 'film'},
+        {'name': 'Солярис', 'year': 1972, 'description': '',
+         'genre': ['drama', 'drama']},
+        {'name': 'Зеркало', 'year': 1975, 'description': '',
+         'genre': ['comedy']},
+        {'id': 0, 'name': 'Нет такого', 'year': 2000, 'description': ''},
+    ])
+    assert response.status_code == 200
+    data = response.json()
+    assert (data['created'], data['updated']) == (1, 1)
+    assert [error['index'] for error in data['errors']] == [2, 3]
+    assert 'genre' in data['errors'][0]['errors']
+    title.refresh_from_db()
+    assert (title.name, title.category.slug) == ('Сталкер', 'film')
+    assert list(Title.objects.get(name='Солярис').genre.values_list(
+        'slug', flat=True
+    )) == ['drama']
+
+
+def test_database_error_fails_only_its_chunk(monkeypatch, admin_api_client):
+    save_titles = bulk.save_titles
+    calls = []
+
+    def failing_second_chunk(*args):
+        calls.append(True)
+        if len(calls) == 2:
+            raise IntegrityError('конфликт')
+        return save_titles(*args)
+
+    monkeypatch.setattr(bulk, 'save_titles', failing_second_chunk)
+    response = admin_api_client.post('/api/v1/titles/bulk/?batch_size=2', [
+        {'name': f'Произведение {number}', 'year': 2000, 'description': ''}
+        for number in range(5)
+    ], format='json')
+    assert response.status_code == 200
+    data = response.json()
+    assert data['created'] == 3
+    assert [error['index'] for error in data['errors']] == [2, 3]
+    assert sorted(Title.objects.values_list('name', flat=True)) == [
+        'Произведение 0', 'Произведение 1', 'Произведение 4'
+    ]
+
+
+@pytest.mark.parametrize('send', (
+    lambda client, url, items: client.post(url, items, format='json'),
+    post_ndjson,
+), ids=('json', 'ndjson'))
+def test_item_count_is_capped(settings, admin_api_client, send):
+    settings.BULK_MAX_ITEMS = 2
+    items = [{'name': f'Жанр {number}', 'slug': f'genre-{number}'}
+             for number in range(3)]
+    response = send(admin_api_client, '/api/v1/genres/bulk/', items)
+    assert response.status_code == 400
+    assert not Genre.objects.exists()
+
+
+def test_bulk_requires_admin(user_api_client):
+    response = user_api_client.post('/api/v1/genres/bulk/', [
+        {'name': 'Драма', 'slug': 'drama'}
+    ], format='json')
+    assert response.status_code == 403
+
+
+def test_upsert_function_is_required():
+    with pytest.raises(ImproperlyConfigured):
+        type('Broken', (BulkUpsertMixin,), {})
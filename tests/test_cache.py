@@ -0,0 +1,54 @@
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+
+from api_yamdb.checks import check_response_cache
+from reviews.models import Category
+
+pytestmark = pytest.mark.django_db
+
+
+def test_hits_and_misses_do_not_write_to_cache(admin_api_client,
+                                               api_client):
+    Category.objects.create(name='Фильм', slug='film')
+    api_client.get('/api/v1/categories/')
+    cache = caches[settings.API_CACHE_ALIAS]
+    keys = set(cache._cache)
+    response = api_client.get('/api/v1/categories/')
+    assert response['X-Cache'] == 'HIT'
+    assert set(cache._cache) == keys
+
+    response = admin_api_client.get('/api/v1/cache/stats/')
+    assert response.json() == {'hits': 1, 'misses': 1}
+    metrics = admin_api_client.get('/api/v1/metrics/').content.decode()
+    assert 'api_cache_lookups_total{result="hit"} 1' in metrics
+    assert 'api_cache_lookups_total{result="miss"} 1' in metrics
+
+
+def test_not_modified(api_client):
+    Category.objects.create(name='Фильм', slug='film')
+    etag = api_client.get('/api/v1/categories/')['ETag']
+    response = api_client.get('/api/v1/categories/',
+                              HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+
+def test_check_rejects_process_local_cache_with_workers(settings):
+    settings.API_WORKERS = 3
+    assert [error.id for error in check_response_cache(None)] == [
+        'api_yamdb.E003'
+    ]
+
+
+def test_check_accepts_shared_cache_with_workers(settings, tmp_path):
+    settings.API_WORKERS = 3
+    settings.CACHES = {**settings.CACHES, 'api': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    }}
+    assert check_response_cache(None) == []
+
+
+def test_check_accepts_single_process_locmem(settings):
+    settings.API_WORKERS = 1
+    assert check_response_cache(None) == []
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from django.utils.http import http_date
+
+from reviews.models import Comment, Review, Title
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def review(user):
+    title = Title.objects.create(name='Сталкер', year=1979, description='')
+    return Review.objects.create(title=title, author=user, text='Да',
+                                 score=8)
+
+
+def reviews_url(review):
+    return f'/api/v1/titles/{review.title_id}/reviews/'
+
+
+def comments_url(review):
+    return f'{reviews_url(review)}{review.id}/comments/'
+
+
+def age(*querysets):
+    past = timezone.now() - timedelta(minutes=1)
+    for queryset in querysets:
+        queryset.update(updated_at=past)
+
+
+def test_edit_changes_etag(api_client, review):
+    etag = api_client.get(reviews_url(review))['ETag']
+    assert api_client.get(
+        reviews_url(review), HTTP_IF_NONE_MATCH=etag
+    ).status_code == 304
+
+    review.text = 'Нет'
+    review.save()
+    response = api_client.get(reviews_url(review), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()['results'][0]['text'] == 'Нет'
+
+
+def test_author_rename_changes_etag(api_client, review, user):
+    Comment.objects.create(review=review, author=user, text='Ок')
+    etags = [
+        api_client.get(url)['ETag']
+        for url in (reviews_url(review), comments_url(review))
+    ]
+    user.username = 'renamed'
+    user.save()
+    for url, etag in zip((reviews_url(review), comments_url(review)),
+                         etags):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['results'][0]['author'] == 'renamed'
+
+
+def test_delete_changes_etag(api_client, review, user):
+    comment = Comment.objects.create(review=review, author=user, text='Ок')
+    etag = api_client.get(comments_url(review))['ETag']
+    comment.delete()
+    assert api_client.get(
+        comments_url(review), HTTP_IF_NONE_MATCH=etag
+    ).status_code == 200
+
+
+def test_fresh_change_has_no_last_modified(api_client, review):
+    response = api_client.get(
+        reviews_url(review), HTTP_IF_MODIFIED_SINCE=http_date()
+    )
+    assert response.status_code == 200
+    assert not response.has_header('Last-Modified')
+
+
+def test_if_modified_since(api_client, review, user):
+    age(Review.objects.all(), type(user).objects.all())
+    last_modified = api_client.get(reviews_url(review))['Last-Modified']
+    assert api_client.get(
+        reviews_url(review), HTTP_IF_MODIFIED_SINCE=last_modified
+    ).status_code == 304
+
+    review.text = 'Нет'
+    review.save()
+    assert api_client.get(
+        reviews_url(review), HTTP_IF_MODIFIED_SINCE=last_modified
+    ).status_code == 200
@@ -0,0 +1,26 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.recorder import MigrationRecorder
+
+from reviews.management.commands.explain_hot_paths import existing_indexes
+from reviews.models import TitleRanking
+from reviews.synthetic import seed_dataset
+
+
+@pytest.mark.django_db(transaction=True)
+def test_compare_keeps_schema_and_data():
+    seed_dataset(users=10, categories=2, genres=3, titles=10, reviews=30,
+                 comments=30, stdout=StringIO())
+    indexes = existing_indexes()
+    applied = MigrationRecorder(connection).applied_migrations()
+    rankings = TitleRanking.objects.count()
+    out = StringIO()
+    call_command('explain_hot_paths', '--compare', '--repeat', '1',
+                 stdout=out)
+    assert 'Без индексов' in out.getvalue()
+    assert existing_indexes() == indexes
+    assert MigrationRecorder(connection).applied_migrations() == applied
+    assert TitleRanking.objects.count() == rankings > 0
@@ -0,0 +1,142 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from api.cache import CATEGORIES, GENRES, TITLES, get_generation
+from custom_user.models import User
+from reviews.loader import CopyWriter
+from reviews.models import Category, Comment, Genre, Review, Title
+
+pytestmark = pytest.mark.django_db
+
+MODELS = (User, Category, Genre, Title, Title.genre.through, Review,
+          Comment)
+FIELDS = {
+    User: ('id', 'username', 'email', 'role', 'bio'),
+    Title: ('id', 'name', 'year', 'description', 'category_id', 'rating',
+            'reviews_count'),
+    Title.genre.through: ('title_id', 'genre_id'),
+    # Время правки при загрузке выставляется заново.
+    Review: ('id', 'title_id', 'author_id', 'text', 'score', 'pub_date'),
+    Comment: ('id', 'review_id', 'author_id', 'text', 'pub_date'),
+}
+
+
+@pytest.fixture
+def catalog():
+    author = User.objects.create(username='author', email='a@example.com',
+                                 bio='Строка с "кавычками", запятой\nи '
+                                     'переводом строки')
+    reader = User.objects.create(username='reader', email='r@example.com')
+    category = Category.objects.create(name='Фильм', slug='film')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Сталкер', year=1979, description='',
+                                 category=category)
+    title.genre.add(genre)
+    Title.objects.create(name='Без категории', year=2000,
+                         description='Описание')
+    review = Review.objects.create(title=title, author=author, text='Да',
+                                   score=9)
+    Review.objects.create(title=title, author=reader, text='Нет', score=4)
+    Comment.objects.create(review=review, author=reader, text='Согласен')
+
+
+def snapshot():
+    return {
+        model: list(
+            model.objects.order_by('pk').values_list(
+                *FIELDS.get(model, ())
+            )
+        )
+        for model in MODELS
+    }
+
+
+def wipe():
+    for model in reversed(MODELS):
+        model.objects.all().delete()
+
+
+def round_trip(tmp_path, file_format, *options):
+    expected = snapshot()
+    call_command('export_catalog', '--format', file_format,
+                 '--output-dir', str(tmp_path), stdout=StringIO())
+    wipe()
+    call_command('load_catalog', str(tmp_path), *options, stdout=StringIO())
+    assert snapshot() == expected
+    return expected
+
+
+@pytest.mark.parametrize('file_format', ('csv', 'ndjson'))
+def test_round_trip(catalog, tmp_path, file_format):
+    expected = round_trip(tmp_path, file_format)
+    # Повторная загрузка пропускает уже загруженные строки.
+    call_command('load_catalog', str(tmp_path), stdout=StringIO())
+    assert snapshot() == expected
+
+
+def test_load_invalidates_cached_responses(
+        catalog, tmp_path, api_client, django_capture_on_commit_callbacks):
+    call_command('export_catalog', '--output-dir', str(tmp_path),
+                 stdout=StringIO())
+    generations = [get_generation(name) for name in (CATEGORIES, GENRES,
+                                                      TITLES)]
+    api_client.get('/api/v1/titles/')
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command('load_catalog', str(tmp_path), stdout=StringIO())
+    assert all(
+        get_generation(name) != generation
+        for name, generation in zip((CATEGORIES, GENRES, TITLES),
+                                    generations)
+    )
+    assert api_client.get('/api/v1/titles/')['X-Cache'] == 'MISS'
+
+
+def test_copy_round_trip(catalog, tmp_path):
+    if connection.vendor != 'postgresql':
+        pytest.skip('COPY есть только в PostgreSQL')
+    round_trip(tmp_path, 'csv', '--copy')
+
+
+def test_copy_payload_separates_null_and_empty_string():
+    titles = [
+        Title(id=1, name='Сталкер', year=1979, description='',
+              category_id=None),
+        Title(id=2, name='Имя, с "кавычками"', year=2000,
+              description='Описание\nв две строки', category_id=3),
+    ]
+    fields, buffer = CopyWriter(Title, 10).payload(titles, connection)
+    assert [field.attname for field in fields] == [
+        'id', 'name', 'year', 'description', 'category_id', 'rating',
+        'reviews_count', 'score_sum',
+    ]
+    assert buffer.readline() == '1,"Сталкер",1979,"",,,0,0\n'
+    row = next(csv.reader(buffer))
+    assert row[1:4] == ['Имя, с "кавычками"', '2000',
+                        'Описание\nв две строки']
+
+
+def test_copy_payload_skips_unset_primary_key():
+    links = [Title.genre.through(title_id=1, genre_id=2)]
+    fields, buffer = CopyWriter(Title.genre.through, 10).payload(
+        links, connection
+    )
+    assert [field.attname for field in fields] == ['title_id', 'genre_id']
+    assert buffer.getvalue() == '1,2\n'
+
+
+def test_comment_dates_survive_copy_payload():
+    date = timezone.now()
+    fields, buffer = CopyWriter(Comment, 10).payload(
+        [Comment(id=1, review_id=1, author_id=1, text='Текст',
+                 pub_date=date)],
+        connection
+    )
+    row = next(csv.reader(buffer))
+    columns = [field.attname for field in fields]
+    assert row[columns.index('pub_date')]
+    assert row[columns.index('updated_at')]
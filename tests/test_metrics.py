@@ -0,0 +1,50 @@
+import pytest
+
+pytestmark = pytest.mark.django_db
+
+METRICS_URL = '/api/v1/metrics/'
+
+
+@pytest.fixture
+def metrics_token(settings):
+    settings.API_METRICS = {**settings.API_METRICS, 'TOKEN': 'secret'}
+
+
+def test_localhost_is_not_trusted_by_default(api_client):
+    response = api_client.get(METRICS_URL, REMOTE_ADDR='127.0.0.1')
+    assert response.status_code == 401
+
+
+def test_allowed_ip(settings, api_client):
+    settings.API_METRICS = {
+        **settings.API_METRICS, 'ALLOWED_IPS': ['10.0.0.5']
+    }
+    assert api_client.get(
+        METRICS_URL, REMOTE_ADDR='10.0.0.5'
+    ).status_code == 200
+    assert api_client.get(
+        METRICS_URL, REMOTE_ADDR='10.0.0.6'
+    ).status_code == 401
+
+
+def test_scrape_token(metrics_token, api_client):
+    response = api_client.get(METRICS_URL, HTTP_AUTHORIZATION='Token secret')
+    assert response.status_code == 200
+    assert 'api_requests' in response.content.decode()
+
+
+@pytest.mark.parametrize('header', ('Token wrong', 'Token', 'secret'))
+def test_wrong_scrape_token(metrics_token, api_client, header):
+    response = api_client.get(METRICS_URL, HTTP_AUTHORIZATION=header)
+    assert response.status_code in (401, 403)
+
+
+def test_empty_token_is_disabled(api_client):
+    assert api_client.get(
+        METRICS_URL, HTTP_AUTHORIZATION='Token '
+    ).status_code == 401
+
+
+def test_admin_and_user(admin_api_client, user_api_client):
+    assert admin_api_client.get(METRICS_URL).status_code == 200
+    assert user_api_client.get(METRICS_URL).status_code == 403
@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from custom_user.models import User
+from reviews.models import Comment, Review, Title, TitleRanking
+
+pytestmark = pytest.mark.django_db
+
+REVIEWS_URL = '/api/v1/moderation/reviews/'
+COMMENTS_URL = '/api/v1/moderation/comments/'
+
+
+@pytest.fixture
+def moderator_client():
+    moderator = User.objects.create(username='moderator',
+                                    email='moderator@example.com',
+                                    role=User.MODERATOR)
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(moderator)}'
+    )
+    return client
+
+
+@pytest.fixture
+def spammer():
+    return User.objects.create(username='spammer', email='s@example.com')
+
+
+@pytest.fixture
+def thread(user, spammer, django_capture_on_commit_callbacks):
+    """Два произведения: у первого отзывы обоих авторов, у второго —
+    только спамера; комментарии есть у каждого отзыва."""
+    titles = [
+        Title.objects.create(name=f'Произведение {number}', year=2000,
+                             description='')
+        for number in range(2)
+    ]
+    with django_capture_on_commit_callbacks(execute=True):
+        reviews = [
+            Review.objects.create(title=titles[0], author=user, text='Да',
+                                  score=8),
+            Review.objects.create(title=titles[0], author=spammer,
+                                  text='Спам', score=1),
+            Review.objects.create(title=titles[1], author=spammer,
+                                  text='Спам', score=1),
+        ]
+    for review in reviews:
+        Comment.objects.create(review=review, author=user, text='Ок')
+        Comment.objects.create(review=review, author=spammer, text='Спам')
+    return titles, reviews
+
+
+def purge(client, url, data, callbacks):
+    with callbacks(execute=True):
+        return client.post(url, data, format='json')
+
+
+def test_purge_reviews_by_author(moderator_client, spammer, thread,
+                                 django_capture_on_commit_callbacks):
+    titles, reviews = thread
+    response = purge(moderator_client, REVIEWS_URL,
+                     {'author': spammer.username},
+                     django_capture_on_commit_callbacks)
+    assert response.status_code == 200
+    assert response.json() == {'reviews': 2, 'comments': 4}
+    assert list(Review.objects.all()) == [reviews[0]]
+    assert Comment.objects.filter(review=reviews[0]).count() == 2
+    for title in titles:
+        title.refresh_from_db()
+    assert (titles[0].reviews_count, titles[0].rating) == (1, 8)
+    assert (titles[1].reviews_count, titles[1].rating) == (0, None)
+    rankings = {
+        ranking.title_id: ranking for ranking in TitleRanking.objects.all()
+    }
+    assert (rankings[titles[0].id].rating,
+            rankings[titles[0].id].reviews_count) == (8, 1)
+    assert (rankings[titles[1].id].rating,
+            rankings[titles[1].id].reviews_count) == (None, 0)
+
+
+def test_purge_reviews_by_ids_and_dates(moderator_client, thread,
+                                        django_capture_on_commit_callbacks):
+    _, reviews = thread
+    Review.objects.filter(pk=reviews[2].pk).update(
+        pub_date=reviews[2].pub_date - timedelta(days=2)
+    )
+    response = purge(moderator_client, REVIEWS_URL, {
+        'ids': [review.id for review in reviews],
+        'until': (reviews[0].pub_date - timedelta(days=1)).isoformat(),
+    }, django_capture_on_commit_callbacks)
+    assert response.json() == {'reviews': 1, 'comments': 2}
+    assert not Review.objects.filter(pk=reviews[2].pk).exists()
+
+
+def test_purge_comments(moderator_client, spammer, thread,
+                        django_capture_on_commit_callbacks):
+    _, reviews = thread
+    response = purge(moderator_client, COMMENTS_URL,
+                     {'author': spammer.username},
+                     django_capture_on_commit_callbacks)
+    assert response.status_code == 200
+    assert response.json() == {'comments': 3}
+    assert set(Comment.objects.values_list('author__username', flat=True)
+               ) == {'user'}
+    assert Review.objects.count() == len(reviews)
+
+
+def test_purge_invalidates_cached_titles(moderator_client, api_client,
+                                         spammer, thread,
+                                         django_capture_on_commit_callbacks):
+    api_client.get('/api/v1/titles/')
+    purge(moderator_client, REVIEWS_URL, {'author': spammer.username},
+          django_capture_on_commit_callbacks)
+    response = api_client.get('/api/v1/titles/')
+    assert response['X-Cache'] == 'MISS'
+    assert {title['rating'] for title in response.json()['results']} == {
+        8, None
+    }
+
+
+@pytest.mark.parametrize('url', (REVIEWS_URL, COMMENTS_URL))
+@pytest.mark.parametrize('data', ({}, {'ids': []}))
+def test_empty_filter_is_rejected(moderator_client, thread, url, data):
+    response = moderator_client.post(url, data, format='json')
+    assert response.status_code == 400
+    assert Review.objects.count() == 3
+    assert Comment.objects.count() == 6
+
+
+@pytest.mark.parametrize('url', (REVIEWS_URL, COMMENTS_URL))
+def test_purge_requires_moderator(api_client, user_api_client, spammer,
+                                  thread, url):
+    data = {'author': spammer.username}
+    assert api_client.post(url, data, format='json').status_code == 401
+    assert user_api_client.post(url, data, format='json').status_code == 403
+    assert Review.objects.count() == 3
+    assert Comment.objects.count() == 6
+
+
+def test_admin_can_purge(admin_api_client, spammer, thread,
+                         django_capture_on_commit_callbacks):
+    response = purge(admin_api_client, COMMENTS_URL,
+                     {'author': spammer.username},
+                     django_capture_on_commit_callbacks)
+    assert response.status_code == 200
@@ -0,0 +1,94 @@
+from io import StringIO
+from smtplib import SMTPException
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from custom_user.models import EmailOutbox, User
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+DATA = {'username': 'reader', 'email': 'reader@example.com'}
+
+
+def signup():
+    return APIClient().post('/api/v1/auth/signup/', DATA, format='json')
+
+
+def send_outbox(*options):
+    call_command('send_outbox', '--workers', '1', *options,
+                 stdout=StringIO())
+
+
+@pytest.fixture
+def failing_send(monkeypatch):
+    """Первые failures отправок падают с ошибкой почтового сервера."""
+    def install(failures):
+        send = EmailMessage.send
+        calls = []
+
+        def flaky_send(self, *args, **kwargs):
+            calls.append(True)
+            if len(calls) <= failures:
+                raise SMTPException('Сервер недоступен')
+            return send(self, *args, **kwargs)
+
+        monkeypatch.setattr(EmailMessage, 'send', flaky_send)
+    return install
+
+
+def test_signup_enqueues_email():
+    assert signup().status_code == 200
+    message = EmailOutbox.objects.get()
+    user = User.objects.get(username=DATA['username'])
+    assert message.to_email == DATA['email']
+    assert str(user.confirmation_code) in message.body
+    assert message.status == EmailOutbox.PENDING
+    assert mail.outbox == []
+
+
+def test_worker_sends_and_marks_sent():
+    signup()
+    send_outbox()
+    assert [email.to for email in mail.outbox] == [[DATA['email']]]
+    message = EmailOutbox.objects.get()
+    assert message.status == EmailOutbox.SENT
+    assert message.attempts == 1
+    assert message.sent_at is not None
+
+
+def test_failure_is_retried(failing_send):
+    failing_send(1)
+    signup()
+    # Без задержки письмо возвращается в очередь и уходит в том же запуске.
+    send_outbox('--backoff', '0')
+    message = EmailOutbox.objects.get()
+    assert message.status == EmailOutbox.SENT
+    assert message.attempts == 2
+    assert 'Сервер недоступен' in message.last_error
+    assert len(mail.outbox) == 1
+
+
+def test_retry_waits_for_backoff(failing_send):
+    failing_send(1)
+    signup()
+    send_outbox('--backoff', '60')
+    send_outbox('--backoff', '60')
+    message = EmailOutbox.objects.get()
+    assert message.status == EmailOutbox.PENDING
+    assert message.attempts == 1
+    assert mail.outbox == []
+
+
+def test_gives_up_after_max_attempts(failing_send):
+    failing_send(2)
+    signup()
+    send_outbox('--backoff', '0', '--max-attempts', '2')
+    message = EmailOutbox.objects.get()
+    assert message.status == EmailOutbox.FAILED
+    assert message.attempts == 2
+    send_outbox('--backoff', '0', '--max-attempts', '2')
+    assert mail.outbox == []
@@ -0,0 +1,38 @@
+import pytest
+from django.conf import settings
+
+from custom_user.models import User
+from reviews.models import Comment, Review, Title
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def many_titles():
+    Title.objects.bulk_create(
+        [Title(name=f'Произведение {number}', year=2000, description='')
+         for number in range(settings.MAX_PAGE_SIZE + 1)]
+    )
+
+
+def test_title_page_size_is_capped(many_titles, api_client):
+    response = api_client.get('/api/v1/titles/?limit=100000')
+    results = b''.join(response.streaming_content).count(b'"genre"')
+    assert results == settings.MAX_PAGE_SIZE
+
+
+def test_comment_limit_is_capped(api_client):
+    author = User.objects.create(username='writer', email='w@example.com')
+    title = Title.objects.create(name='Сталкер', year=1979, description='')
+    review = Review.objects.create(title=title, author=author, text='Да',
+                                   score=9)
+    Comment.objects.bulk_create(
+        [Comment(review=review, author=author, text='Комментарий')
+         for _ in range(settings.MAX_PAGE_SIZE + 1)]
+    )
+    response = api_client.get(
+        f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        '?limit=100000'
+    )
+    content = b''.join(response.streaming_content)
+    assert content.count(b'"author"') == settings.MAX_PAGE_SIZE
@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+
+import pytest
+
+psycopg2 = pytest.importorskip('psycopg2')
+
+from django.db import OperationalError  # noqa: E402
+from psycopg2 import extensions  # noqa: E402
+
+from api_yamdb.postgresql_pool.base import (  # noqa: E402
+    BlockingConnectionPool, DatabaseWrapper, PoolTimeout, pools)
+
+
+class FakeInfo:
+    transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConnection:
+    """Соединение psycopg2 без сервера: пулу нужны только эти атрибуты."""
+    info = FakeInfo()
+
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed = 1
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fake_connect(monkeypatch):
+    monkeypatch.setattr(psycopg2, 'connect',
+                        lambda *args, **kwargs: FakeConnection())
+
+
+def test_checkout_and_return_reuses_connection():
+    pool = BlockingConnectionPool(1, 2, timeout=0.1)
+    connection = pool.getconn()
+    pool.putconn(connection)
+    assert pool.getconn() is connection
+
+
+def test_exhausted_pool_times_out():
+    pool = BlockingConnectionPool(1, 1, timeout=0.05)
+    pool.getconn()
+    started = time.monotonic()
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    assert time.monotonic() - started >= 0.05
+
+
+def test_waiter_gets_returned_connection():
+    pool = BlockingConnectionPool(1, 1, timeout=5)
+    connection = pool.getconn()
+    received = []
+    waiter = threading.Thread(target=lambda: received.append(pool.getconn()))
+    waiter.start()
+    time.sleep(0.05)
+    pool.putconn(connection)
+    waiter.join(1)
+    assert received == [connection]
+
+
+def test_exhausted_pool_raises_operational_error():
+    wrapper = DatabaseWrapper(
+        {'NAME': 'test', 'USER': '', 'PASSWORD': '', 'HOST': '',
+         'PORT': '', 'OPTIONS': {}, 'TIME_ZONE': None,
+         'CONN_MAX_AGE': 0, 'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False},
+        alias='pool_test'
+    )
+    pool = pools[('pool_test', os.getpid())] = BlockingConnectionPool(
+        1, 1, timeout=0.01
+    )
+    try:
+        pool.getconn()
+        with pytest.raises(OperationalError, match='pool_test'):
+            wrapper.get_new_connection({})
+    finally:
+        del pools[('pool_test', os.getpid())]
@@ -0,0 +1,147 @@
+import pytest
+
+from custom_user.models import User
+from reviews.models import Category, Comment, Genre, Review, Title
+
+pytestmark = pytest.mark.django_db
+
+PAGE_SIZES = (5, 50, 500)
+
+
+def read(response):
+    assert response.status_code == 200, response.content
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+@pytest.fixture(autouse=True)
+def no_streaming(settings):
+    # Потоковая отдача читает страницу частями, по запросу на часть;
+    # её бюджет проверяется отдельно.
+    settings.STREAMING_LIST_THRESHOLD = 10 ** 6
+
+
+def create_titles(size):
+    category = Category.objects.create(name='Фильм', slug='film')
+    Genre.objects.bulk_create(
+        [Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+         for number in range(3)]
+    )
+    genres = list(Genre.objects.all())
+    # bulk_create не везде возвращает id, поэтому строки читаются заново.
+    Title.objects.bulk_create(
+        [Title(name=f'Произведение {number}', year=2000,
+               description='', category=category)
+         for number in range(size)]
+    )
+    titles = list(Title.objects.order_by('id'))
+    Title.genre.through.objects.bulk_create(
+        [Title.genre.through(title_id=title.id, genre_id=genre.id)
+         for title in titles for genre in genres]
+    )
+    return titles
+
+
+def create_users(size):
+    User.objects.bulk_create(
+        [User(username=f'user{number}', email=f'user{number}@example.com')
+         for number in range(size)]
+    )
+    return list(User.objects.filter(username__startswith='user'))
+
+
+def create_reviews(size):
+    title = create_titles(1)[0]
+    Review.objects.bulk_create(
+        [Review(title=title, author=author, text='Отзыв', score=5)
+         for author in create_users(size)]
+    )
+    return title
+
+
+def create_comments(size):
+    title = create_reviews(1)
+    review = title.reviews.get()
+    Comment.objects.bulk_create(
+        [Comment(review=review, author=review.author, text='Комментарий')
+         for _ in range(size)]
+    )
+    return review
+
+
+@pytest.mark.parametrize('size', PAGE_SIZES)
+def test_titles_list(size, api_client, django_assert_num_queries):
+    create_titles(size)
+    with django_assert_num_queries(3):
+        read(api_client.get(f'/api/v1/titles/?limit={size}'))
+
+
+@pytest.mark.parametrize('size', PAGE_SIZES)
+def test_title_detail(size, api_client, django_assert_num_queries):
+    title = create_titles(size)[0]
+    with django_assert_num_queries(2):
+        read(api_client.get(f'/api/v1/titles/{title.id}/'))
+
+
+@pytest.mark.parametrize('size', PAGE_SIZES)
+def test_reviews_list(size, api_client, django_assert_num_queries):
+    title = create_reviews(size)
+    with django_assert_num_queries(4):
+        content = read(api_client.get(
+            f'/api/v1/titles/{title.id}/reviews/?limit={size}'
+        ))
+    assert content.count(b'"author"') == size
+
+
+@pytest.mark.parametrize('size', PAGE_SIZES)
+def test_comments_list(size, api_client, django_assert_num_queries):
+    review = create_comments(size)
+    with django_assert_num_queries(4):
+        content = read(api_client.get(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+            f'/comments/?limit={size}'
+        ))
+    assert content.count(b'"author"') == size
+
+
+# Категории, жанры и пользователи отдаются страницами фиксированного
+# размера PAGE_SIZE: проверяется, что бюджет не зависит от числа строк.
+@pytest.mark.parametrize('path', ('categories', 'genres'))
+def test_slug_lists(path, settings, api_client, django_assert_num_queries):
+    Category.objects.bulk_create(
+        [Category(name=f'Категория {number}', slug=f'category-{number}')
+         for number in range(500)]
+    )
+    Genre.objects.bulk_create(
+        [Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+         for number in range(500)]
+    )
+    with django_assert_num_queries(2):
+        response = api_client.get(f'/api/v1/{path}/')
+    assert response.status_code == 200
+    assert len(response.json()['results']) == (
+        settings.REST_FRAMEWORK['PAGE_SIZE']
+    )
+
+
+def test_users_list(settings, admin_api_client, django_assert_num_queries):
+    create_users(500)
+    with django_assert_num_queries(3):
+        response = admin_api_client.get('/api/v1/users/')
+    assert response.status_code == 200
+    assert len(response.json()['results']) == (
+        settings.REST_FRAMEWORK['PAGE_SIZE']
+    )
+
+
+@pytest.mark.parametrize('size', (500, 1000))
+def test_streamed_titles_list(size, settings, api_client,
+                              django_assert_num_queries):
+    settings.STREAMING_LIST_THRESHOLD = 500
+    settings.STREAMING_CHUNK_SIZE = 100
+    create_titles(size)
+    # Число строк, выборка страницы и подгрузка жанров на каждую часть.
+    with django_assert_num_queries(2 + size // 100):
+        content = read(api_client.get(f'/api/v1/titles/?limit={size}'))
+    assert content.count(b'"genre"') == size
@@ -0,0 +1,130 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from custom_user.models import User
+from reviews import rankings
+from reviews.models import Category, Genre, Review, Title, TitleRanking
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def titles():
+    category = Category.objects.create(name='Фильм', slug='film')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    titles = [
+        Title.objects.create(name=f'Произведение {number}', year=2000,
+                             description='', category=category)
+        for number in range(3)
+    ]
+    for title in titles:
+        title.genre.add(drama)
+    titles[1].genre.add(comedy)
+    return titles
+
+
+def review(title, number, score):
+    author, _ = User.objects.get_or_create(
+        username=f'author{number}', email=f'author{number}@example.com'
+    )
+    return Review.objects.create(title=title, author=author, text='Текст',
+                                 score=score)
+
+
+@pytest.fixture
+def reviewed(titles, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        for title, scores in zip(titles, ((10, 9), (5,), (8, 8, 8))):
+            for number, score in enumerate(scores):
+                review(title, number, score)
+    return titles
+
+
+def ids(response):
+    assert response.status_code == 200, response.content
+    return [title['id'] for title in response.json()]
+
+
+def test_top_and_trending(reviewed, api_client):
+    first, second, third = (title.id for title in reviewed)
+    assert ids(api_client.get('/api/v1/titles/top/')) == [
+        first, third, second
+    ]
+    assert ids(api_client.get('/api/v1/titles/trending/')) == [
+        third, first, second
+    ]
+    assert ids(api_client.get('/api/v1/titles/top/?genre=comedy')) == [
+        second
+    ]
+    assert ids(api_client.get('/api/v1/titles/top/?category=none')) == []
+    assert ids(api_client.get('/api/v1/titles/top/?limit=1')) == [first]
+
+
+def test_top_item_matches_title_detail(reviewed, api_client):
+    top = api_client.get('/api/v1/titles/top/').json()[0]
+    assert top == api_client.get(f'/api/v1/titles/{top["id"]}/').json()
+
+
+def test_rankings_follow_review_writes(titles, api_client,
+                                       django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        written = review(titles[0], 0, 3)
+    assert TitleRanking.objects.get(title=titles[0]).rating == 3
+    with django_capture_on_commit_callbacks(execute=True):
+        written.score = 7
+        written.save()
+    assert TitleRanking.objects.get(title=titles[0]).rating == 7
+    with django_capture_on_commit_callbacks(execute=True):
+        written.delete()
+    assert ids(api_client.get('/api/v1/titles/top/')) == []
+
+
+def test_review_writes_shift_ranking_in_transaction(
+        monkeypatch, reviewed, django_capture_on_commit_callbacks):
+    title = reviewed[0]
+    refreshed = []
+    monkeypatch.setattr(rankings, 'refresh_rankings', refreshed.append)
+    with django_capture_on_commit_callbacks(execute=True):
+        written = review(title, 5, 5)
+        written.score = 2
+        written.save()
+        review(title, 6, 3)
+        old = Review.objects.filter(title=title).earliest('pub_date')
+        Review.objects.filter(pk=old.pk).update(
+            pub_date=timezone.now() - timedelta(days=30)
+        )
+        Review.objects.get(pk=old.pk).delete()
+    # Строка уже есть: полный пересчёт не нужен.
+    assert refreshed == []
+    ranking = TitleRanking.objects.get(title=title)
+    title.refresh_from_db()
+    assert (ranking.rating, ranking.reviews_count) == (
+        title.rating, title.reviews_count
+    ) == (14 / 3, 3)
+    # Удалённый старый отзыв вне периода трендов его счётчики не трогает.
+    assert (ranking.recent_reviews, ranking.recent_score_sum) == (4, 24)
+
+
+def test_old_reviews_leave_trending_after_refresh(reviewed, api_client):
+    Review.objects.filter(title=reviewed[2]).update(
+        pub_date=timezone.now() - timedelta(days=30)
+    )
+    call_command('refresh_rankings', '--trending', stdout=StringIO())
+    assert reviewed[2].id not in ids(
+        api_client.get('/api/v1/titles/trending/')
+    )
+
+
+def test_delete_reviewed_title(reviewed, admin_api_client,
+                               django_capture_on_commit_callbacks):
+    title = reviewed[0]
+    with django_capture_on_commit_callbacks(execute=True):
+        response = admin_api_client.delete(f'/api/v1/titles/{title.id}/')
+    assert response.status_code == 204
+    assert not Title.objects.filter(pk=title.id).exists()
+    assert not TitleRanking.objects.filter(title_id=title.id).exists()
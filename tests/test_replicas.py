@@ -0,0 +1,108 @@
+import time
+
+import pytest
+from django.db import router
+
+from api.cache import CATEGORIES, generation_key, get_cache
+from api_yamdb.checks import check_replica_pin_cache
+from api_yamdb.middleware import PIN_COOKIE
+from api_yamdb.routers import ReplicaRouter, is_pinned, replica_reads
+from reviews.models import Category
+
+pytestmark = pytest.mark.django_db
+
+FILE_CACHE = {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+
+
+def signup(client):
+    return client.post('/api/v1/auth/signup/', {
+        'username': 'user', 'email': 'user@example.com'
+    }, format='json')
+
+
+def test_no_pin_cookie_without_replicas(settings, api_client):
+    settings.REPLICA_DATABASES = []
+    response = signup(api_client)
+    assert response.status_code == 200
+    assert PIN_COOKIE not in response.cookies
+
+
+def test_write_pins_client_and_user(settings, user, user_api_client):
+    settings.REPLICA_DATABASES = ['default']
+    settings.REPLICA_PIN_CACHE_ALIAS = 'api'
+    response = user_api_client.patch('/api/v1/users/me/', {'bio': 'Текст'},
+                                     format='json')
+    assert response.status_code == 200
+    assert PIN_COOKIE in response.cookies
+    assert is_pinned(user.pk)
+
+
+@pytest.fixture
+def replica_read_log(monkeypatch):
+    """Записывает, разрешено ли было чтение с реплики при каждом чтении."""
+    log = []
+    db_for_read = ReplicaRouter.db_for_read
+
+    def logged(self, model, **hints):
+        log.append(replica_reads.get())
+        return db_for_read(self, model, **hints)
+
+    monkeypatch.setattr(ReplicaRouter, 'db_for_read', logged)
+    return log
+
+
+def test_write_alias_does_not_change_read_routing():
+    token = replica_reads.set(True)
+    try:
+        router.db_for_write(Category)
+        assert replica_reads.get()
+    finally:
+        replica_reads.reset(token)
+
+
+def test_fresh_generation_is_cached_from_primary(settings, api_client,
+                                                 replica_read_log):
+    settings.REPLICA_PIN_SECONDS = 5
+    Category.objects.create(name='Фильм', slug='film')
+    get_cache().set(generation_key(CATEGORIES), time.time_ns(),
+                    timeout=None)
+    assert api_client.get('/api/v1/categories/')['X-Cache'] == 'MISS'
+    assert replica_read_log and not any(replica_read_log)
+
+    replica_read_log.clear()
+    get_cache().set(generation_key(CATEGORIES),
+                    time.time_ns() - 6 * 10**9, timeout=None)
+    assert api_client.get('/api/v1/categories/')['X-Cache'] == 'MISS'
+    assert replica_read_log and all(replica_read_log)
+
+
+def test_check_passes_without_replicas(settings):
+    settings.REPLICA_DATABASES = []
+    assert check_replica_pin_cache(None) == []
+
+
+def test_check_rejects_process_local_pin_cache(settings):
+    settings.REPLICA_DATABASES = ['replica_1']
+    settings.REPLICA_PIN_CACHE_ALIAS = 'default'
+    assert [error.id for error in check_replica_pin_cache(None)] == [
+        'api_yamdb.E002'
+    ]
+
+
+def test_check_rejects_unknown_pin_cache(settings):
+    settings.REPLICA_DATABASES = ['replica_1']
+    settings.REPLICA_PIN_CACHE_ALIAS = 'missing'
+    assert [error.id for error in check_replica_pin_cache(None)] == [
+        'api_yamdb.E001'
+    ]
+
+
+def test_check_accepts_shared_pin_cache(settings, tmp_path):
+    settings.REPLICA_DATABASES = ['replica_1']
+    settings.CACHES = {**settings.CACHES, 'pins': {
+        **FILE_CACHE, 'LOCATION': str(tmp_path)
+    }}
+    settings.REPLICA_PIN_CACHE_ALIAS = 'pins'
+    assert check_replica_pin_cache(None) == []
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from api.serializers import SignUpSerializer
+from custom_user.models import User
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+DATA = {'username': 'racer', 'email': 'racer@example.com'}
+
+
+def signup(data=DATA):
+    return APIClient().post(SIGNUP_URL, data, format='json')
+
+
+@pytest.fixture
+def competitor(monkeypatch):
+    """Вставляет пользователя между проверкой и созданием в первом запросе,
+    как это сделал бы параллельный запрос."""
+    def install(username, email):
+        validate = SignUpSerializer.validate
+        calls = []
+
+        def racing_validate(self, data):
+            data = validate(self, data)
+            if not calls:
+                calls.append(True)
+                User.objects.create(username=username, email=email)
+            return data
+
+        monkeypatch.setattr(SignUpSerializer, 'validate', racing_validate)
+    return install
+
+
+@pytest.mark.django_db
+def test_lost_race_with_same_data_returns_user(competitor):
+    competitor(**DATA)
+    response = signup()
+    assert response.status_code == 200, response.content
+    assert response.json() == DATA
+    assert User.objects.filter(username=DATA['username']).count() == 1
+
+
+@pytest.mark.django_db
+def test_lost_race_for_email_is_rejected(competitor):
+    competitor(username='other', email=DATA['email'])
+    response = signup()
+    assert response.status_code == 400, response.content
+    assert not User.objects.filter(username=DATA['username']).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_signups_create_one_user():
+    if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+        pytest.skip('SQLite в памяти не принимает параллельную запись')
+    workers = 8
+    barrier = threading.Barrier(workers)
+    statuses = []
+
+    def run():
+        try:
+            barrier.wait()
+            statuses.append(signup().status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [200] * workers
+    assert User.objects.filter(username=DATA['username']).count() == 1
@@ -0,0 +1,50 @@
+import pytest
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from custom_user.models import User
+
+pytestmark = pytest.mark.django_db
+
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.mark.parametrize('body', ([], [1], 'x', 1, None))
+def test_non_object_body_is_rejected(body, api_client):
+    response = api_client.post(TOKEN_URL, body, format='json')
+    assert response.status_code == 400, response.content
+
+
+def test_token_for_valid_code(api_client):
+    user = User.objects.create(username='user', email='user@example.com')
+    response = api_client.post(TOKEN_URL, {
+        'username': user.username,
+        'confirmation_code': str(user.confirmation_code),
+    }, format='json')
+    assert response.status_code == 201
+    token = AccessToken(response.json()['token'])
+    assert token[api_settings.USER_ID_CLAIM] == user.id
+
+
+def test_token_uses_user_id_field(monkeypatch, api_client):
+    monkeypatch.setattr(api_settings, 'USER_ID_FIELD', 'username')
+    user = User.objects.create(username='user', email='user@example.com')
+    response = api_client.post(TOKEN_URL, {
+        'username': user.username,
+        'confirmation_code': str(user.confirmation_code),
+    }, format='json')
+    token = AccessToken(response.json()['token'])
+    assert token[api_settings.USER_ID_CLAIM] == 'user'
+
+
+def test_bad_codes_are_throttled_by_username(settings, api_client):
+    settings.TOKEN_RATE_LIMIT = {'RATE': 0.001, 'BURST': 2,
+                                 'MAX_KEYS': 100}
+    User.objects.create(username='user', email='user@example.com')
+    statuses = [
+        api_client.post(TOKEN_URL, {
+            'username': 'user', 'confirmation_code': 'bad'
+        }, format='json', REMOTE_ADDR=f'10.0.0.{number}').status_code
+        for number in range(3)
+    ]
+    assert statuses == [400, 400, 429]